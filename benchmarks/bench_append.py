@@ -0,0 +1,67 @@
+"""Refresh after appending rows: incremental (tail parse + folded aggregates)
+vs a full reload of the file and a rebuild of the aggregates.
+
+    python -m benchmarks.bench_append --rows 1000000 --append 10000
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.synthetic import make_dataset, write_csv
+from dashboard import loader
+from dashboard.columnar import cache_path
+from dashboard.correlation import get_correlation_engine
+from dashboard.cube import get_cube
+
+
+def _refresh(path, columnar):
+    timings = {}
+    t = time.perf_counter()
+    df = loader.load_dataset(path, columnar=columnar)
+    timings["load"] = time.perf_counter() - t
+    t = time.perf_counter()
+    get_cube(df)
+    timings["cube"] = time.perf_counter() - t
+    t = time.perf_counter()
+    get_correlation_engine(df)
+    timings["correlation"] = time.perf_counter() - t
+    return df, timings
+
+
+def run(rows, append, workdir, columnar):
+    source = os.path.join(workdir, f"students_{rows}.csv")
+    if not os.path.exists(source):
+        write_csv(rows, source)
+    path = os.path.join(workdir, "append", "students.csv")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    shutil.copy(source, path)
+    shutil.rmtree(cache_path(path), ignore_errors=True)
+    tail = make_dataset(append, seed=1)
+
+    loader.clear_cache()
+    _refresh(path, columnar)
+    tail.to_csv(path, mode="a", header=False, index=False)
+    df, incremental = _refresh(path, columnar)
+
+    # Same file, nothing cached: what every refresh cost before
+    loader.clear_cache()
+    shutil.rmtree(cache_path(path), ignore_errors=True)
+    full_df, full = _refresh(path, columnar)
+    assert len(df) == len(full_df) == rows + append
+
+    mode = "columnar" if columnar else "in-memory"
+    for step in incremental:
+        print(f"{rows:>10} + {append:<8} {mode:<9}  {step:<12} incremental {incremental[step] * 1000:9.1f} ms"
+              f"   full {full[step] * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--append", type=int, default=10_000)
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "dashboard-bench"))
+    args = parser.parse_args()
+    for columnar in [True, False]:
+        run(args.rows, args.append, args.workdir, columnar)
@@ -0,0 +1,114 @@
+"""The query backends of dashboard/backend.py, timed and cross-checked.
+
+Every installed backend runs the group statistics on the same synthetic
+dataset (the aggregation cube's GROUP BY and a treemap-sized group mean) and
+the full cube build. Each result is compared with the pandas one; the script
+exits with status 1 if any differs beyond float rounding (counts must be
+equal).
+
+    python -m benchmarks.bench_backends                        # 1M and 10M rows
+    python -m benchmarks.bench_backends --rows 1000000 --backends pandas duckdb
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_sections import environment, timed
+from benchmarks.synthetic import make_dataset
+from dashboard.backend import BACKENDS, query_backend
+from dashboard.cube import CUBE_DIMENSIONS, CUBE_MEASURE, AggregationCube, cube_frame
+
+TREEMAP = ["School_Type", "Parental_Education_Level", "Gender"]
+RTOL = 1e-12
+
+
+def cases(cube_df, backend):
+    return {
+        "group_stats_cube": lambda: backend.group_stats(cube_df, CUBE_DIMENSIONS, CUBE_MEASURE),
+        "group_mean": lambda: backend.group_stats(cube_df, TREEMAP, CUBE_MEASURE)[TREEMAP + ["count", "mean"]],
+        "cube_build": lambda: AggregationCube(cube_df, CUBE_DIMENSIONS, CUBE_MEASURE, backend),
+    }
+
+
+def difference(result, expected):
+    """None if identical, the max relative difference if within RTOL, else inf."""
+    if isinstance(result, AggregationCube):
+        pairs = [(getattr(result, k), getattr(expected, k)) for k in ["count", "n_measure", "sum", "sumsq"]]
+        return max((difference(a, b) or 0.0 for a, b in pairs), default=0.0) or None
+    if isinstance(result, pd.DataFrame):
+        if result.equals(expected):
+            return None
+        if not (result.columns.equals(expected.columns) and result.index.equals(expected.index)):
+            return float("inf")
+        numeric = result.select_dtypes(include="number").columns
+        if not result.drop(columns=numeric).equals(expected.drop(columns=numeric)):
+            return float("inf")
+        return difference(result[numeric].to_numpy(dtype=float), expected[numeric].to_numpy(dtype=float))
+    result, expected = np.asarray(result), np.asarray(expected)
+    if result.shape != expected.shape:
+        return float("inf")
+    if np.array_equal(result, expected, equal_nan=result.dtype.kind == "f"):
+        return None
+    if result.dtype.kind not in "f" and expected.dtype.kind not in "f":
+        return float("inf")
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rel = np.abs(result - expected) / np.maximum(np.abs(expected), np.finfo(float).tiny)
+    if not np.array_equal(np.isnan(result), np.isnan(expected)):
+        return float("inf")
+    diff = float(np.nanmax(rel))
+    return diff if diff <= RTOL else float("inf")
+
+
+def run(rows_list, backends, repeat=3):
+    results, mismatches = [], []
+    for rows in rows_list:
+        cube_df = cube_frame(make_dataset(rows))
+        expected = {}
+        for name in backends:
+            backend = query_backend(name)
+            for case, fn in cases(cube_df, backend).items():
+                fn()  # warm-up (DuckDB plans, Polars thread pool)
+                times, result = timed(fn, repeat)
+                if name == "pandas":
+                    expected[case], check = result, "reference"
+                else:
+                    diff = difference(result, expected[case])
+                    check = "identical" if diff is None else f"max rel diff {diff:.1e}"
+                    if diff == float("inf"):
+                        check = "DIFFERENT"
+                        mismatches.append((rows, name, case))
+                results.append({"rows": rows, "backend": name, "case": case, "best_s": min(times), "check": check})
+                print(f"{rows:>10}  {name:<7} {case:<17} best {min(times) * 1000:10.2f} ms   {check}")
+        del cube_df, expected
+    return results, mismatches
+
+
+def installed(names):
+    available = []
+    for name in names:
+        try:
+            query_backend(name)
+        except ImportError as exc:
+            print(f"skipping {name}: {exc}")
+            continue
+        available.append(name)
+    return available
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="*", default=[1_000_000, 10_000_000])
+    parser.add_argument("--backends", nargs="*", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    env = environment()
+    print(f"{env['python']} pandas {env['pandas']} numpy {env['numpy']}, {env['cpus']} CPUs, commit {env['commit']}")
+    # pandas is the reference every other backend is checked against
+    backends = installed(["pandas"] + [name for name in args.backends if name != "pandas"])
+    _, mismatches = run(args.rows, backends, args.repeat)
+    if mismatches:
+        print(f"\n{len(mismatches)} result(s) differ from pandas: {mismatches}")
+        sys.exit(1)
@@ -0,0 +1,78 @@
+"""Categorical chart aggregates per rerun: raw-row pandas (what app.py did
+before the cube) vs roll-ups of dashboard.cube.
+
+    python -m benchmarks.bench_cube --rows 10000 1000000
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from benchmarks.bench_sankey import STAGES, legacy_links
+from benchmarks.synthetic import make_dataset
+from dashboard.cube import AggregationCube, CUBE_DIMENSIONS, CUBE_MEASURE, cube_frame
+from dashboard.filters import derived_columns
+from dashboard.marimekko import mekko_from_counts
+from dashboard.sankey import sankey_from_cube
+
+SESSION_ORDER = ["0", "1", "2", "3", "4+"]
+SCHOOLS = ["Public", "Private"]
+GENDERS = ["Male", "Female"]
+
+
+def legacy_aggregates(df):
+    treemap = df.groupby(["School_Type", "Parental_Education_Level", "Gender"],
+                         as_index=False, observed=True)["Exam_Score"].mean()
+    pie = df[df["Gender"].isin(GENDERS)]["Peer_Influence"].value_counts()
+
+    mekko_df = df.dropna(subset=["Distance_from_Home"]).copy()
+    mekko_df["Sessions"] = mekko_df["Tutoring_Sessions"].apply(lambda s: str(s) if 0 <= s <= 3 else "4+")
+    mekko = pd.crosstab(mekko_df["Distance_from_Home"], mekko_df["Sessions"])
+    mekko = mekko.apply(lambda x: x / x.sum() * 100, axis=1)
+
+    filtered = df[df["School_Type"].isin(SCHOOLS)]
+    sankey_df = filtered.assign(**derived_columns(filtered))
+    sankey = legacy_links(sankey_df)
+    return treemap, pie, mekko, sankey
+
+
+def cube_aggregates(cube):
+    treemap = cube.rollup(["School_Type", "Parental_Education_Level", "Gender"])
+    pie = cube.rollup(["Peer_Influence"], where={"Gender": GENDERS})
+    counts, (rows, cols) = cube.table(["Distance_from_Home", "Tutoring_Group"])
+    mekko = mekko_from_counts(pd.DataFrame(counts, index=rows, columns=cols), SESSION_ORDER)
+    sankey = sankey_from_cube(cube, STAGES, where={"School_Type": SCHOOLS})
+    return treemap, pie, mekko, sankey
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t)
+    return min(times), result
+
+
+def run(rows_list, repeat=3):
+    results = []
+    for rows in rows_list:
+        df = make_dataset(rows)
+        legacy_time, legacy = best_of(lambda: legacy_aggregates(df), repeat)
+        build_time, cube = best_of(
+            lambda: AggregationCube(cube_frame(df), CUBE_DIMENSIONS, CUBE_MEASURE), 1)
+        rollup_time, rolled = best_of(lambda: cube_aggregates(cube), repeat)
+        assert legacy[3] == rolled[3]["value"].tolist(), "Sankey counts differ"
+        results.append({"rows": rows, "legacy_rerun_s": legacy_time,
+                        "cube_build_s": build_time, "cube_rerun_s": rollup_time})
+        print(f"{rows:>10}  raw rows {legacy_time:8.4f}s  cube rerun {rollup_time:8.4f}s  "
+              f"(one-off build {build_time:.4f}s)")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="*", default=[10_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.rows, args.repeat)
@@ -0,0 +1,81 @@
+"""Cold-start benchmark: plain pd.read_csv vs the typed loader vs the
+memory-mapped columnar cache vs the chunked streaming summary.
+
+    python -m benchmarks.bench_load              # 6.6k (real file), 1M, 10M rows
+    python -m benchmarks.bench_load --rows 1000000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.synthetic import write_csv
+from dashboard.loader import DATA_PATH
+
+DEFAULT_ROWS = [0, 1_000_000, 10_000_000]  # 0 = the real data file
+
+# Each measurement runs in a fresh interpreter so nothing is cached in-process.
+# (import, timed statement) pairs; only the statement is timed.
+_SNIPPETS = {
+    "read_csv": ("import pandas as pd", "df = pd.read_csv(PATH)"),
+    "typed_parse": ("from dashboard.loader import read_dataset", "df = read_dataset(PATH)"),
+    "columnar_build": ("from dashboard.columnar import build_columnar_cache",
+                       "build_columnar_cache(PATH)"),
+    "columnar_mmap": ("from dashboard.columnar import read_columnar, cache_path",
+                      "df = read_columnar(cache_path(PATH))"),
+    # Out-of-core mode: one chunked pass, peak memory independent of file size
+    "stream_summary": ("from dashboard.streaming import stream_dataset",
+                       "summary = stream_dataset(PATH)"),
+}
+
+
+def _time_snippet(snippet, path):
+    setup, code = snippet
+    script = (
+        "import time, resource\n"
+        f"{setup}\n"
+        f"PATH = {path!r}\n"
+        "t = time.perf_counter()\n"
+        f"{code}\n"
+        "elapsed = time.perf_counter() - t\n"
+        "rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+        "print(elapsed, rss)\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", script], check=True, capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    elapsed, rss = out.stdout.split()
+    return float(elapsed), int(rss)
+
+
+def run(rows_list, workdir):
+    results = []
+    for rows in rows_list:
+        if rows == 0:
+            path = os.path.abspath(DATA_PATH)
+        else:
+            path = os.path.join(workdir, f"students_{rows}.csv")
+            if not os.path.exists(path):
+                write_csv(rows, path)
+        for name in ["read_csv", "typed_parse", "columnar_build", "columnar_mmap", "stream_summary"]:
+            elapsed, rss = _time_snippet(_SNIPPETS[name], path)
+            results.append({"rows": rows or "data", "step": name,
+                            "seconds": round(elapsed, 4), "max_rss_kb": rss})
+            print(f"{str(rows or 'data'):>10}  {name:<15} {elapsed:8.3f}s  rss {rss / 1024:8.1f} MB")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="*", default=DEFAULT_ROWS)
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "dashboard-bench"))
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.workdir)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=1)
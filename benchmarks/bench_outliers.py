@@ -0,0 +1,72 @@
+"""IQR outlier filter: the old remove_outliers_iqr vs dashboard.outliers.
+
+Checks that trim_outliers(sequential=True) returns exactly the rows of the old
+function, that the default single-pass mode matches a pandas reference with
+every column's fences taken from the unfiltered frame, and how far the
+sketch fences are from the exact ones.
+
+    python -m benchmarks.bench_outliers --rows 10000 1000000
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_sankey import best_of
+from benchmarks.synthetic import make_dataset
+from dashboard.outliers import IQR_COLUMNS, iqr_bounds, partition_sketches, sketch_iqr_bounds, trim_outliers
+
+
+def legacy_remove_outliers_iqr(data, cols):
+    # app.py before dashboard.outliers
+    clean_df = data.copy()
+    for col in cols:
+        if col in clean_df.columns and pd.api.types.is_numeric_dtype(clean_df[col]):
+            Q1 = clean_df[col].quantile(0.25)
+            Q3 = clean_df[col].quantile(0.75)
+            IQR = Q3 - Q1
+            lower = Q1 - 1.5 * IQR
+            upper = Q3 + 1.5 * IQR
+            clean_df = clean_df[(clean_df[col] >= lower) & (clean_df[col] <= upper)]
+    return clean_df
+
+
+def independent_reference(data, cols):
+    keep = pd.Series(True, index=data.index)
+    for col in cols:
+        q1, q3 = data[col].quantile([0.25, 0.75])
+        keep &= data[col].between(q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1))
+    return data[keep]
+
+
+def run(rows_list, repeat):
+    for rows in rows_list:
+        df = make_dataset(rows)
+        legacy = legacy_remove_outliers_iqr(df, IQR_COLUMNS)
+        sequential = trim_outliers(df, sequential=True)
+        single = trim_outliers(df)
+        assert sequential.index.equals(legacy.index), "sequential mode differs from remove_outliers_iqr"
+        assert single.index.equals(independent_reference(df, IQR_COLUMNS).index), "single-pass mode differs"
+
+        exact = iqr_bounds(df)
+        approx = sketch_iqr_bounds(partition_sketches(df))
+        fence_error = max(abs(np.subtract(exact[col], approx[col])).max() for col in IQR_COLUMNS)
+
+        t_legacy, _ = best_of(lambda: legacy_remove_outliers_iqr(df, IQR_COLUMNS), repeat)
+        t_sequential, _ = best_of(lambda: trim_outliers(df, sequential=True), repeat)
+        t_single, _ = best_of(lambda: trim_outliers(df), repeat)
+        sketches = partition_sketches(df)
+        t_sketch, _ = best_of(lambda: sketch_iqr_bounds(sketches, where={"School_Type": ["Public"]}), repeat)
+        print(f"{rows:>10} rows  legacy {t_legacy * 1000:8.2f} ms  sequential {t_sequential * 1000:8.2f} ms"
+              f"  single-pass {t_single * 1000:8.2f} ms  sketch fences {t_sketch * 1000:6.2f} ms")
+        print(f"{'':>16}kept: legacy {len(legacy):,}  single-pass {len(single):,}"
+              f" ({len(single.index.symmetric_difference(legacy.index)):,} rows differ);"
+              f" max sketch fence error {fence_error:.3g}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="*", default=[10_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.rows, args.repeat)
@@ -0,0 +1,157 @@
+"""Bytes per figure sent to the browser, as Plotly builds it vs compact_figure.
+
+Every chart is built at its default widget state (and the 3D scatter colored
+by Gender too) with DASHBOARD_COMPACT_FIGURES off and on. For each figure the
+script reports the JSON size, its gzip size (roughly what goes over a
+compressed websocket) and the time to serialize and to parse it again, and it
+checks that both versions draw the same points with the same hover text.
+
+    python -m benchmarks.bench_payload [data/student_performance.csv]
+"""
+import argparse
+import gzip
+import json
+import os
+import re
+import time
+from collections import Counter
+
+import numpy as np
+import plotly.io as pio
+
+from dashboard.loader import DATA_PATH
+from dashboard.sections import (
+    build_box,
+    build_heatmap,
+    build_mekko,
+    build_parallel,
+    build_pie,
+    build_sankey,
+    build_scatter3d,
+    build_treemap,
+    build_violin,
+    open_dashboard,
+)
+from dashboard.snapshots import DEFAULT_THRESHOLD
+
+POINT_TRACES = {"box", "violin", "scatter", "scattergl", "scatter3d"}
+# Trace fields that compact_figure moves around; compared per point instead
+MOVED_FIELDS = {"x", "y", "z", "x0", "y0", "customdata", "hovertext", "hovertemplate",
+                "showlegend", "legendgroup", "marker"}
+_FIELD = re.compile(r"%\{([^}:]+)(?::[^}]*)?\}")
+
+
+def default_figures(data):
+    schools = list(data.df["School_Type"].unique())
+    parallel_index, scatter_index = data.parallel_index(schools, False), data.scatter3d_index()
+
+    def full(index, column):
+        return float(index.min(column)), float(index.max(column))
+    scatter = [full(scatter_index, c) for c in ("Hours_Studied", "Previous_Scores", "Exam_Score")]
+    return {
+        "box": lambda: build_box(data, schools),
+        "treemap": lambda: build_treemap(data),
+        "parallel": lambda: build_parallel(
+            data, schools, False, full(parallel_index, "Hours_Studied"), full(parallel_index, "Attendance"),
+            full(parallel_index, "Sleep_Hours"), full(parallel_index, data.motivation_col))[0],
+        "scatter3d": lambda: build_scatter3d(data, *scatter, "Exam_Score")[0],
+        "scatter3d_gender": lambda: build_scatter3d(data, *scatter, "Gender")[0],
+        "heatmap": lambda: build_heatmap(
+            data, schools, data.filtered(schools).select_dtypes(include="number").columns.tolist(),
+            DEFAULT_THRESHOLD),
+        "sankey": lambda: build_sankey(data, schools, sorted(data.df["Motivation_Level"].unique()),
+                                       ["Low", "Medium", "High"]),
+        "violin": lambda: build_violin(data),
+        "pie": lambda: build_pie(data, list(data.df["Gender"].unique())),
+        "marimekko": lambda: build_mekko(data),
+    }
+
+
+def build(fn, compact):
+    os.environ["DASHBOARD_COMPACT_FIGURES"] = "1" if compact else "0"
+    return fn()
+
+
+def normalize(value):
+    # Compare values, not dtypes: 17 (int8) == 17.0 (float64 in an object array)
+    if isinstance(value, np.ndarray):
+        return [normalize(v) for v in value.tolist()]
+    if isinstance(value, (list, tuple)):
+        return [normalize(v) for v in value]
+    if isinstance(value, dict):
+        return {k: normalize(v) for k, v in value.items()}
+    if isinstance(value, (int, float, np.number)) and not isinstance(value, bool):
+        value = float(value)
+        return str(int(value)) if value.is_integer() else repr(value)
+    return value
+
+
+def expand(fig):
+    """(points, other): every point with its rendered hover text, and the remaining trace/layout data."""
+    points, other, legend = Counter(), [], []
+    for trace in fig.data:
+        spec = normalize(trace.to_plotly_json())
+        if spec.get("showlegend", True) is not False and spec.get("name") not in legend:
+            legend.append(spec.get("name"))
+        if spec["type"] not in POINT_TRACES or not isinstance(spec.get("hovertemplate"), str):
+            other.append(spec)
+            continue
+        marker = spec.get("marker", {})
+        n = max(len(spec[k]) for k in ("x", "y", "z") if isinstance(spec.get(k), list))
+
+        def field(name, i):
+            if name.startswith("customdata["):
+                return spec["customdata"][i][int(name[len("customdata["):-1])]
+            source = marker if name.startswith("marker.") else spec
+            value = source.get(name.split(".")[-1], spec.get(name + "0"))
+            return value[i] if isinstance(value, list) else value
+        for i in range(n):
+            text = _FIELD.sub(lambda m: str(field(m.group(1), i)), spec["hovertemplate"])
+            points[(spec["type"], spec.get("name"), field("x", i), field("y", i), field("z", i),
+                    field("marker.size", i), field("marker.color", i), text)] += 1
+        static = {k: v for k, v in spec.items() if k not in MOVED_FIELDS}
+        static["marker"] = {k: v for k, v in marker.items() if not isinstance(v, list)}
+        if static not in other:
+            other.append(static)
+    return points, other, legend, normalize(fig.layout.to_plotly_json())
+
+
+def measure(fig, repeat):
+    best_dump = best_load = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        payload = pio.to_json(fig, validate=False)
+        best_dump = min(best_dump, time.perf_counter() - t)
+        t = time.perf_counter()
+        json.loads(payload)
+        best_load = min(best_load, time.perf_counter() - t)
+    return len(payload), len(gzip.compress(payload.encode(), 6)), best_dump, best_load
+
+
+def run(csv_path, repeat=5):
+    data = open_dashboard(csv_path)
+    totals = np.zeros(4)
+    print(f"{'figure':<17} {'JSON before':>12} {'after':>10} {'gzip before':>12} {'after':>9}"
+          f" {'dump ms':>13} {'parse ms':>13}  same")
+    for name, fn in default_figures(data).items():
+        before = build(fn, compact=False)
+        start = time.perf_counter()
+        after = build(fn, compact=True)
+        elapsed = time.perf_counter() - start
+        same = expand(before) == expand(after)
+        b, a = measure(before, repeat), measure(after, repeat)
+        totals += [b[0], a[0], b[1], a[1]]
+        print(f"{name:<17} {b[0]:>12,} {a[0]:>10,} {b[1]:>12,} {a[1]:>9,}"
+              f" {b[2] * 1000:>6.1f}/{a[2] * 1000:<6.1f} {b[3] * 1000:>6.1f}/{a[3] * 1000:<6.1f}"
+              f"  {'yes' if same else 'NO'}   (build + compact {elapsed * 1000:.0f} ms)")
+        if not same:
+            raise SystemExit(f"{name}: the compact figure differs from the original")
+    print(f"{'total':<17} {totals[0]:>12,.0f} {totals[1]:>10,.0f} {totals[2]:>12,.0f} {totals[3]:>9,.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("csv_path", nargs="?", default=DATA_PATH)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.csv_path, args.repeat)
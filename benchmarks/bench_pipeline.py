@@ -0,0 +1,84 @@
+"""Full-page rerun latency of app.py with 1, 4 and 8 section workers.
+
+Each timed rerun starts with an empty section cache, so every chart is built
+again; the dataset-level caches (loader, filter index, cube, ...) stay warm as
+they would in a running server. A warm rerun (all sections cached) is timed
+as well.
+
+    python -m benchmarks.bench_pipeline                     # real data file
+    python -m benchmarks.bench_pipeline --rows 1000000 --executor process
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.synthetic import write_csv
+from dashboard.loader import DATA_PATH
+from dashboard.memo import section_cache
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "app.py")
+DEFAULT_WORKERS = [1, 4, 8]
+
+
+def _app_dir(rows, workdir):
+    # app.py reads data/student_performance.csv relative to the working directory
+    if rows == 0:
+        return ROOT
+    app_dir = os.path.join(workdir, f"app_{rows}")
+    path = os.path.join(app_dir, DATA_PATH)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_csv(rows, path)
+    return app_dir
+
+
+def _rerun(at, cold):
+    if cold:
+        section_cache().clear()
+    start = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return elapsed
+
+
+def run(rows, workers_list, executor, repeat, workdir):
+    os.chdir(_app_dir(rows, workdir))
+    os.environ["DASHBOARD_EXECUTOR"] = executor
+    at = AppTest.from_file(APP_PATH, default_timeout=600)
+    _rerun(at, cold=True)  # loads the dataset and builds the dataset-level caches
+
+    results = []
+    for workers in workers_list:
+        os.environ["DASHBOARD_WORKERS"] = str(workers)
+        cold = min(_rerun(at, cold=True) for _ in range(repeat))
+        warm = min(_rerun(at, cold=False) for _ in range(repeat))
+        results.append({"rows": rows or "data", "executor": executor, "workers": workers,
+                        "cold_seconds": round(cold, 4), "warm_seconds": round(warm, 4)})
+        print(f"{str(rows or 'data'):>10}  {executor:<8} workers={workers:<2}"
+              f"  cold {cold:7.3f}s  warm {warm:7.3f}s")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=0, help="0 = the real data file")
+    parser.add_argument("--workers", type=int, nargs="*", default=DEFAULT_WORKERS)
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "dashboard-bench"))
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    results = run(args.rows, args.workers, args.executor, args.repeat, args.workdir)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=1)
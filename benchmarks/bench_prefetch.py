@@ -0,0 +1,89 @@
+"""Latency of one-click filter changes, with and without the background warm-up.
+
+Starting from the default page state, every one-click change of the school,
+gender, Sankey motivation and score filters is timed as the rerun would see
+it: the sections whose inputs change are fetched through get_section. Each
+click starts from the same state (section cache holding only the current
+page); with prefetching, the warm-up scheduled for that state has finished
+before the click.
+
+    python -m benchmarks.bench_prefetch [data/student_performance.csv]
+"""
+import argparse
+import statistics
+import time
+
+from dashboard.filters import SCORE_LEVEL_LABELS
+from dashboard.loader import DATA_PATH
+from dashboard.memo import get_section, prefetch_cache, section_cache
+from dashboard.prefetch import PREFETCH_BUILDERS, Prefetcher, motivation_options, neighbour_states
+from dashboard.sections import open_dashboard
+from dashboard.snapshots import default_inputs
+
+
+def default_state(data):
+    """{section: inputs} of a fresh page, for the sections the warm-up covers."""
+    schools = list(data.df["School_Type"].unique())
+    index = data.parallel_index(schools, False)
+
+    def full(column):
+        return float(index.min(column)), float(index.max(column))
+    defaults = default_inputs(data)
+    return {
+        "box": {"school_option": schools},
+        "parallel": {"school_option": schools, "remove_outliers": False, "hours_range": full("Hours_Studied"),
+                     "attendance_range": full("Attendance"), "sleep_range": full("Sleep_Hours"),
+                     "motivation_range": full(data.motivation_col)},
+        "heatmap": defaults["heatmap"],
+        "sankey": {"school_option": schools, "motivation_filter": motivation_options(data, schools),
+                   "score_filter": list(SCORE_LEVEL_LABELS)},
+        "pie": defaults["pie"],
+    }
+
+
+def fetch(data, sections):
+    for section, inputs in sections.items():
+        get_section(data.df, section, inputs, lambda: PREFETCH_BUILDERS[section](data, **inputs))
+
+
+def reset(data, current):
+    # Only the current page is cached, as after a rerun
+    section_cache().clear()
+    prefetch_cache().clear()
+    fetch(data, current)
+
+
+def run(csv_path, budget_s=60.0):
+    data = open_dashboard(csv_path)
+    current = default_state(data)
+    clicks = list(neighbour_states(data, current))
+    prefetcher = Prefetcher(budget_s=budget_s, share=1.0)
+    results = {}
+    for mode in ["warm-up", "cold", "prefetched"]:
+        times = []
+        for name, value, sections in clicks:
+            reset(data, current)
+            if mode == "prefetched":
+                t = time.perf_counter()
+                prefetcher.schedule("bench", data, current).result()
+                warmup_s = time.perf_counter() - t
+            start = time.perf_counter()
+            fetch(data, sections)
+            times.append(time.perf_counter() - start)
+            if mode == "prefetched":
+                print(f"  {name:<18} {str(value):<45} {times[-1] * 1000:8.2f} ms"
+                      f"  (warm-up {warmup_s * 1000:.0f} ms, {len(sections)} sections)")
+        results[mode] = times
+    for mode in ["cold", "prefetched"]:
+        times = results[mode]
+        print(f"{mode:<11} {len(times)} clicks: median {statistics.median(times) * 1000:8.2f} ms,"
+              f" max {max(times) * 1000:8.2f} ms")
+    print(f"prefetch stats: {prefetcher.stats}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("csv_path", nargs="?", default=DATA_PATH)
+    parser.add_argument("--budget", type=float, default=60.0, help="warm-up CPU seconds per state")
+    args = parser.parse_args()
+    run(args.csv_path, args.budget)
@@ -0,0 +1,65 @@
+"""Sankey link building: the original nested count loops vs build_sankey_links.
+
+    python -m benchmarks.bench_sankey --rows 10000 1000000
+"""
+import argparse
+import time
+
+from benchmarks.synthetic import make_dataset
+from dashboard.filters import SCORE_LEVEL_LABELS, STUDY_HOURS_LABELS, derived_columns
+from dashboard.sankey import build_sankey_links
+
+STAGES = [
+    ("Study_Hours_Group", "Study", STUDY_HOURS_LABELS),
+    ("Motivation_Level", "Motivation", None),
+    ("Score_Level", "Score", SCORE_LEVEL_LABELS),
+]
+
+
+def legacy_links(df_sankey):
+    # The loops app.py used before (one full scan per label pair)
+    counts = []
+    for s in df_sankey["Study_Hours_Group"].cat.categories:
+        for m in sorted(df_sankey["Motivation_Level"].unique()):
+            c = len(df_sankey[(df_sankey["Study_Hours_Group"] == s) &
+                              (df_sankey["Motivation_Level"] == m)])
+            if c > 0:
+                counts.append(c)
+    for m in sorted(df_sankey["Motivation_Level"].unique()):
+        for sc in df_sankey["Score_Level"].cat.categories:
+            c = len(df_sankey[(df_sankey["Motivation_Level"] == m) &
+                              (df_sankey["Score_Level"] == sc)])
+            if c > 0:
+                counts.append(c)
+    return counts
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t)
+    return min(times), result
+
+
+def run(rows_list, repeat=3):
+    results = []
+    for rows in rows_list:
+        df = make_dataset(rows)
+        df = df.assign(**derived_columns(df))
+        legacy_time, legacy = best_of(lambda: legacy_links(df), repeat)
+        new_time, links = best_of(lambda: build_sankey_links(df, STAGES), repeat)
+        assert legacy == links["value"].tolist(), "link counts differ"
+        results.append({"rows": rows, "legacy_s": legacy_time, "vectorized_s": new_time})
+        print(f"{rows:>10}  loops {legacy_time:8.4f}s  bincount {new_time:8.4f}s  "
+              f"x{legacy_time / new_time:6.1f}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="*", default=[10_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.rows, args.repeat)
@@ -0,0 +1,180 @@
+"""Data preparation of every chart section, timed headlessly (no Streamlit).
+
+"setup" cases are the per-dataset builds a server pays once after loading
+(filter bitsets, aggregation cube, correlation statistics, range index);
+"rerun" cases are what a section costs when one of its widgets changes. The
+datasets come from benchmarks.synthetic (real rows resampled, so the schema
+and category distributions match data/student_performance.csv).
+
+Results are written as JSON and can be compared with an earlier run; the
+script exits with status 1 when a case got slower than the tolerance allows.
+
+    python -m benchmarks.bench_sections --output results.json   # 10k, 1M, 10M rows
+    python -m benchmarks.bench_sections --rows 10000 1000000 --baseline results.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_sankey import STAGES
+from benchmarks.synthetic import SIZES, make_dataset
+from dashboard.boxplot import box_stats
+from dashboard.correlation import CorrelationEngine
+from dashboard.cube import CUBE_DIMENSIONS, CUBE_MEASURE, AggregationCube, cube_frame
+from dashboard.filters import FilterIndex, RangeIndex, derived_columns
+from dashboard.loader import NUMERIC_COLUMNS
+from dashboard.marimekko import mekko_from_counts
+from dashboard.outliers import trim_outliers
+from dashboard.sampling import PARALLEL_POINT_BUDGET, SCATTER3D_POINT_BUDGET, downsample
+from dashboard.sankey import sankey_from_cube
+from dashboard.violin import split_kde
+
+# One representative widget state per section
+SCHOOLS = ["Public"]
+GENDERS = ["Male", "Female"]
+MOTIVATION = ["Low", "High"]
+SCORES = ["Medium", "High"]
+PARALLEL_COLUMNS = ["Hours_Studied", "Attendance", "Sleep_Hours", "Exam_Score"]
+PARALLEL_RANGES = {"Hours_Studied": (5, 30), "Attendance": (70, 100)}
+SCATTER_COLUMNS = ["Hours_Studied", "Previous_Scores", "Exam_Score"]
+SCATTER_RANGES = {"Hours_Studied": (10, 30), "Exam_Score": (60, 90)}
+SESSION_ORDER = ["0", "1", "2", "3", "4+"]
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_cases(df):
+    return {
+        "filter_index": lambda: FilterIndex(df, derived=derived_columns(df)),
+        "cube": lambda: AggregationCube(cube_frame(df), CUBE_DIMENSIONS, CUBE_MEASURE),
+        "correlation_engine": lambda: CorrelationEngine.from_frame(df),
+        "scatter3d_index": lambda: RangeIndex(df.dropna(subset=SCATTER_COLUMNS), SCATTER_COLUMNS),
+    }
+
+
+def rerun_cases(df, built):
+    filter_index, cube = built["filter_index"], built["cube"]
+    filtered = filter_index.select({"School_Type": SCHOOLS})
+    parallel_index = RangeIndex(trim_outliers(filtered), PARALLEL_COLUMNS)
+
+    def filters():
+        # Resolved selections are memoized; time the first resolution
+        filter_index._resolved.clear()
+        return filter_index.select({"School_Type": SCHOOLS})
+
+    def mekko():
+        counts, (rows, cols) = cube.table(["Distance_from_Home", "Tutoring_Group"])
+        return mekko_from_counts(pd.DataFrame(counts, index=rows, columns=cols), SESSION_ORDER)
+
+    return {
+        "filters": filters,
+        "box": lambda: box_stats(filtered, "Teacher_Quality", "Attendance", ["Low", "Medium", "High"]),
+        "treemap": lambda: cube.rollup(["School_Type", "Parental_Education_Level", "Gender"]),
+        "outliers": lambda: trim_outliers(filtered),
+        "parallel": lambda: downsample(parallel_index.select(PARALLEL_RANGES), PARALLEL_POINT_BUDGET,
+                                       method="stratified", strata=["Gender", "Motivation_Level"]),
+        "scatter3d": lambda: downsample(built["scatter3d_index"].select(SCATTER_RANGES), SCATTER3D_POINT_BUDGET,
+                                        method="voxel", columns=SCATTER_COLUMNS),
+        "correlation": lambda: built["correlation_engine"].corr(NUMERIC_COLUMNS, partitions=SCHOOLS),
+        "sankey": lambda: sankey_from_cube(
+            cube, STAGES,
+            where={"School_Type": SCHOOLS, "Motivation_Level": MOTIVATION, "Score_Level": SCORES},
+            highlight={"Motivation_Level": MOTIVATION}),
+        "violin": lambda: split_kde(df, "Motivation_Level", "Gender", "Exam_Score",
+                                    list(df["Motivation_Level"].cat.categories), ["Female", "Male"]),
+        "pie": lambda: cube.rollup(["Peer_Influence"], where={"Gender": GENDERS}),
+        "marimekko": mekko,
+    }
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t)
+    return times, result
+
+
+def run(rows_list, repeat=5, setup_repeat=1):
+    results = []
+    for rows in rows_list:
+        df = make_dataset(rows)
+        built = {}
+        for case, fn in setup_cases(df).items():
+            times, built[case] = timed(fn, setup_repeat)
+            results.append(_result(rows, case, "setup", times))
+        for case, fn in rerun_cases(df, built).items():
+            fn()  # warm-up
+            times, _ = timed(fn, repeat)
+            results.append(_result(rows, case, "rerun", times))
+        del df, built
+    return results
+
+
+def _result(rows, case, kind, times):
+    result = {"rows": rows, "case": case, "kind": kind, "best_s": min(times),
+              "median_s": statistics.median(times), "repeat": len(times)}
+    print(f"{rows:>10}  {kind:<5}  {case:<18} best {result['best_s'] * 1000:10.2f} ms"
+          f"  median {result['median_s'] * 1000:10.2f} ms")
+    return result
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"commit": commit, "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(), "pandas": pd.__version__, "numpy": np.__version__,
+            "platform": platform.platform(), "cpus": os.cpu_count()}
+
+
+def compare(results, baseline, tolerance, min_delta):
+    """Cases slower than baseline by more than tolerance (and min_delta seconds)."""
+    previous = {(r["rows"], r["case"]): r for r in baseline["results"]}
+    regressions = []
+    print(f"\n{'rows':>10}  {'case':<18} {'baseline':>12} {'now':>12}   ratio")
+    for result in results:
+        before = previous.get((result["rows"], result["case"]))
+        if before is None:
+            continue
+        ratio = result["best_s"] / before["best_s"] if before["best_s"] else float("inf")
+        slower = ratio > 1 + tolerance and result["best_s"] - before["best_s"] > min_delta
+        if slower:
+            regressions.append({**result, "baseline_s": before["best_s"], "ratio": ratio})
+        print(f"{result['rows']:>10}  {result['case']:<18} {before['best_s'] * 1000:9.2f} ms"
+              f" {result['best_s'] * 1000:9.2f} ms  x{ratio:5.2f}{'  REGRESSION' if slower else ''}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="*", default=SIZES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown (0.25 = 25%%)")
+    parser.add_argument("--min-delta", type=float, default=0.001,
+                        help="ignore slowdowns smaller than this many seconds (timer noise)")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.repeat)
+    report = {"environment": environment(), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance, args.min_delta)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) slower than the baseline")
+            sys.exit(1)
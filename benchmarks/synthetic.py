@@ -0,0 +1,46 @@
+"""Synthetic datasets with the same schema as data/student_performance.csv.
+
+    python -m benchmarks.synthetic --rows 10000 1000000 10000000 --out-dir data/synthetic
+"""
+import argparse
+import os
+
+import numpy as np
+
+from dashboard.loader import DATA_PATH, read_dataset
+
+# Dataset sizes the benchmarks run at by default
+SIZES = [10_000, 1_000_000, 10_000_000]
+
+
+def make_dataset(rows, seed=0, source=DATA_PATH):
+    # Resample real rows (with replacement) so every column keeps its
+    # distribution and the columns keep their joint structure.
+    base = read_dataset(source)
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(base), size=rows)
+    return base.iloc[picks].reset_index(drop=True)
+
+
+def write_csv(rows, path, seed=0, chunk_rows=1_000_000):
+    # Written in chunks so 10M-row files do not need the whole frame in memory
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    first = True
+    done = 0
+    while done < rows:
+        n = min(chunk_rows, rows - done)
+        chunk = make_dataset(n, seed=seed + done)
+        chunk.to_csv(path, mode="w" if first else "a", header=first, index=False)
+        first = False
+        done += n
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="*", default=SIZES)
+    parser.add_argument("--out-dir", default="data/synthetic")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    for rows in args.rows:
+        print(write_csv(rows, os.path.join(args.out_dir, f"students_{rows}.csv"), seed=args.seed))
@@ -0,0 +1 @@
+# Data layer for the Student Performance Dashboard (app.py)
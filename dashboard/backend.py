@@ -0,0 +1,186 @@
+"""Query backends for the row scans of the aggregation layer.
+
+The charts read precomputed structures (filter bitsets, the aggregation cube,
+correlation sums, quantile sketches), so a rerun rarely scans rows. The one
+scan left over the full frame is the GROUP BY that fills the aggregation cube
+(dashboard/cube.py), once per dataset, and that is where a columnar
+multithreaded engine pays off on multi-million-row files. A backend answers it:
+
+    group_stats(df, by, measure)       count / non-null count / sum / sum of
+                                       squares / mean of measure per group
+
+Every backend returns the same pandas objects in the same order, so callers
+never see which one ran (``python -m benchmarks.bench_backends`` checks it):
+
+    DASHBOARD_BACKEND   "pandas" (default), "duckdb" or "polars"
+
+DuckDB and Polars are optional and not in requirements.txt; choosing one
+that is not installed raises an ImportError that names the package. They see
+the pandas frame directly (DuckDB scans it in place, Polars converts the
+columns a query needs), so the rest of the dashboard keeps working on pandas.
+"""
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+BACKENDS = ("pandas", "duckdb", "polars")
+GROUP_STATS_COLUMNS = ["count", "n", "sum", "sumsq", "mean"]
+
+
+def backend_name():
+    name = os.environ.get("DASHBOARD_BACKEND", "pandas").lower()
+    if name not in BACKENDS:
+        raise ValueError(f"DASHBOARD_BACKEND must be one of {BACKENDS}, got {name!r}")
+    return name
+
+
+# ----------------------------- CANONICAL OUTPUTS ---------------------------------
+def _categories(df, col):
+    return list(pd.Categorical(df[col]).categories)
+
+
+def _sort_groups(out, df, by):
+    # Groups in category order of df's columns, the missing key last, with
+    # categorical key columns (whatever type the engine returned them as)
+    codes = []
+    for col in by:
+        categories = _categories(df, col)
+        out[col] = pd.Categorical(out[col].astype(object).where(out[col].notna(), None), categories=categories)
+        code = out[col].cat.codes.to_numpy().astype(np.int64)
+        codes.append(np.where(code < 0, len(categories), code))
+    order = np.lexsort(codes[::-1]) if codes else np.arange(len(out))
+    return out.iloc[order].reset_index(drop=True)
+
+
+def _group_stats_frame(out, df, by):
+    out = _sort_groups(out, df, by)
+    for col in ["count", "n"]:
+        out[col] = out[col].astype(np.int64)
+    for col in ["sum", "sumsq"]:
+        out[col] = out[col].astype(float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out["mean"] = np.where(out["n"] > 0, out["sum"] / out["n"].where(out["n"] > 0, 1), np.nan)
+    return out[list(by) + GROUP_STATS_COLUMNS]
+
+
+def _measure(series):
+    # Numeric values with NaN as missing
+    return pd.to_numeric(series, errors="coerce").astype(float)
+
+
+# ----------------------------- PANDAS ---------------------------------
+class PandasBackend:
+    """The reference: plain pandas/NumPy, single-threaded."""
+
+    name = "pandas"
+
+    def group_stats(self, df, by, measure):
+        m = _measure(df[measure])
+        frame = pd.DataFrame({**{col: df[col] for col in by}, "m": m, "m2": m * m})
+        out = frame.groupby(list(by), observed=True, dropna=False, sort=False).agg(
+            count=("m", "size"), n=("m", "count"), sum=("m", "sum"), sumsq=("m2", "sum")
+        ).reset_index()
+        return _group_stats_frame(out, df, by)
+
+
+# ----------------------------- DUCKDB ---------------------------------
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+class DuckDBBackend:
+    """In-process SQL engine; scans the pandas frame in place on all cores."""
+
+    name = "duckdb"
+
+    def __init__(self):
+        try:
+            import duckdb
+        except ImportError as exc:
+            raise ImportError("DASHBOARD_BACKEND=duckdb needs the duckdb package (pip install duckdb)") from exc
+        self._connection = duckdb.connect()
+
+    def _query(self, sql, frame):
+        # A cursor per query: connections must not be shared between threads
+        cursor = self._connection.cursor()
+        try:
+            cursor.register("t", frame)
+            return cursor.execute(sql).df()
+        finally:
+            cursor.close()
+
+    def _frame(self, df, columns, numeric=()):
+        # Only the columns a query reads. Float columns become nullable, so NaN
+        # is NULL; integer columns are scanned as they are and cast in SQL.
+        data = {}
+        for col in columns:
+            series = df[col]
+            if col in numeric and series.dtype.kind not in "iu":
+                series = _measure(series).astype("Float64")
+            data[col] = getattr(series, "array", series)
+        return pd.DataFrame(data, copy=False)
+
+    def group_stats(self, df, by, measure):
+        frame = self._frame(df, list(by) + [measure], numeric=[measure])
+        keys = ", ".join(_quote(col) for col in by)
+        m = f"CAST({_quote(measure)} AS DOUBLE)"
+        out = self._query(
+            f"SELECT {keys}, count(*) AS count, count({m}) AS n, coalesce(sum({m}), 0) AS sum,"
+            f" coalesce(sum({m} * {m}), 0) AS sumsq FROM t GROUP BY {keys}", frame)
+        return _group_stats_frame(out, df, by)
+
+
+# ----------------------------- POLARS ---------------------------------
+class PolarsBackend:
+    """Columnar DataFrame engine; multithreaded, converts the columns a query reads."""
+
+    name = "polars"
+
+    def __init__(self):
+        try:
+            import polars
+        except ImportError as exc:
+            raise ImportError("DASHBOARD_BACKEND=polars needs the polars package (pip install polars)") from exc
+        self.pl = polars
+
+    def _frame(self, df, columns, numeric=()):
+        # Categories as strings (gathered from the category codes), NaN as null
+        pl = self.pl
+        data = {}
+        for col in columns:
+            if col in numeric:
+                data[col] = pl.Series(col, _measure(df[col]).to_numpy(), nan_to_null=True)
+            else:
+                cat = pd.Categorical(df[col])
+                codes = pl.Series(col, np.where(cat.codes < 0, np.nan, cat.codes), nan_to_null=True)
+                labels = pl.Series(col, [str(c) for c in cat.categories], dtype=pl.Utf8)
+                data[col] = labels.gather(codes.cast(pl.UInt32))
+        return pl.DataFrame(data)
+
+    def group_stats(self, df, by, measure):
+        pl = self.pl
+        frame = self._frame(df, list(by)).with_columns(
+            pl.Series("m", _measure(df[measure]).to_numpy(), nan_to_null=True))
+        m = pl.col("m")
+        out = frame.group_by(list(by)).agg(
+            pl.len().alias("count"), m.count().alias("n"), m.sum().alias("sum"), (m * m).sum().alias("sumsq")
+        ).to_pandas()
+        return _group_stats_frame(out, df, by)
+
+
+_BACKEND_TYPES = {"pandas": PandasBackend, "duckdb": DuckDBBackend, "polars": PolarsBackend}
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def query_backend(name=None):
+    """The configured backend (DASHBOARD_BACKEND), created once per process."""
+    name = name or backend_name()
+    if name not in BACKENDS:
+        raise ValueError(f"backend must be one of {BACKENDS}, got {name!r}")
+    with _backends_lock:
+        if name not in _backends:
+            _backends[name] = _BACKEND_TYPES[name]()
+        return _backends[name]
@@ -0,0 +1,153 @@
+"""Server-side box plot statistics for large datasets.
+
+Below ``BOX_POINTS_THRESHOLD`` rows the dashboard keeps the plain
+``px.box(points="all")`` chart. Above it, quartiles, whiskers and outliers are
+computed here per group and sent as precomputed box traces, and only a random
+sample of ``BOX_SAMPLE_SIZE`` rows is drawn as the point cloud, so the page
+size no longer grows with the dataset.
+"""
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from dashboard.memo import DatasetCache
+
+BOX_POINTS_THRESHOLD = 50_000
+BOX_SAMPLE_SIZE = 5_000
+BOX_MAX_OUTLIERS = 2_000  # per group
+
+
+def box_stats(df, group_col, value_col, groups):
+    """Quartiles, Tukey whiskers and outlier row positions for every group."""
+    codes = pd.Categorical(df[group_col], categories=groups).codes
+    values = df[value_col].to_numpy(dtype=float)
+    valid = (codes >= 0) & ~np.isnan(values)
+
+    # One stable sort by group, then every group is a contiguous slice
+    positions = np.flatnonzero(valid)
+    order = positions[np.argsort(codes[positions], kind="stable")]
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(codes[positions], minlength=len(groups)))])
+
+    stats = []
+    for i, name in enumerate(groups):
+        rows = order[bounds[i]:bounds[i + 1]]
+        if len(rows) == 0:
+            continue
+        group_values = values[rows]
+        q1, median, q3 = np.quantile(group_values, [0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        inside = (group_values >= q1 - 1.5 * iqr) & (group_values <= q3 + 1.5 * iqr)
+        stats.append({
+            "name": name,
+            "count": len(rows),
+            "q1": q1,
+            "median": median,
+            "q3": q3,
+            "mean": group_values.mean(),
+            "lowerfence": group_values[inside].min(),
+            "upperfence": group_values[inside].max(),
+            "outliers": rows[~inside],
+        })
+    return stats
+
+
+def sketch_box_stats(sketches, data, group_col, value_col):
+    """box_stats() with quartiles/fences from full-data quantile sketches.
+
+    sketches maps group name -> QuantileSketch; data is the sampled frame, and
+    the outliers are its rows outside the fences (streaming mode).
+    """
+    values = data[value_col].to_numpy(dtype=float)
+    stats = []
+    for name, sketch in sketches.items():
+        if sketch.count == 0:
+            continue
+        q1, median, q3 = sketch.quantile([0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        lower, upper = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+        lowerfence, upperfence = sketch.within(lower, upper)
+        in_group = (data[group_col] == name).to_numpy()
+        stats.append({
+            "name": name,
+            "count": sketch.count,
+            "q1": q1,
+            "median": median,
+            "q3": q3,
+            "mean": sketch.mean,
+            "lowerfence": lowerfence,
+            "upperfence": upperfence,
+            "outliers": np.flatnonzero(in_group & ((values < lower) | (values > upper))),
+        })
+    return stats
+
+
+# --> stats per (dataset, filter state)
+_stats_cache = DatasetCache(max_entries=8)
+
+
+def get_box_stats(df, key, data, group_col, value_col, groups):
+    # df identifies the dataset version; data is the filtered frame for key
+    return _stats_cache.get(df, key, lambda: box_stats(data, group_col, value_col, groups))
+
+
+def sample_rows(n_rows, size, seed=0):
+    # Sorted positions of a fixed-seed sample, so the cloud doesn't jump between reruns
+    if n_rows <= size:
+        return np.arange(n_rows)
+    rng = np.random.default_rng(seed)
+    return np.sort(rng.choice(n_rows, size=size, replace=False))
+
+
+def aggregated_box_figure(df, stats, x, y, hover_data, sample_size=BOX_SAMPLE_SIZE, seed=0, total_rows=None):
+    """Box figure from precomputed stats plus a sampled point cloud.
+
+    total_rows is the row count the stats describe when df is itself a sample.
+    """
+    colors = px.colors.qualitative.Plotly
+    fig = go.Figure()
+    sample = df.iloc[sample_rows(len(df), sample_size, seed)]
+
+    for i, group in enumerate(stats):
+        color = colors[i % len(colors)]
+        name = group["name"]
+        fig.add_trace(go.Box(
+            x=[name],
+            q1=[group["q1"]], median=[group["median"]], q3=[group["q3"]],
+            lowerfence=[group["lowerfence"]], upperfence=[group["upperfence"]],
+            mean=[group["mean"]],
+            name=name, legendgroup=name, offsetgroup=name,
+            marker_color=color, boxpoints=False,
+        ))
+
+        outliers = group["outliers"]
+        if len(outliers) > BOX_MAX_OUTLIERS:
+            outliers = outliers[sample_rows(len(outliers), BOX_MAX_OUTLIERS, seed)]
+        points = pd.concat([sample[sample[x] == name], df.iloc[outliers]])
+        points = points[~points.index.duplicated()]
+        fig.add_trace(go.Box(
+            x=points[x].astype(str),
+            y=points[y],
+            customdata=points[hover_data].to_numpy(),
+            hovertemplate=(
+                f"{x}=%{{x}}<br>{y}=%{{y}}<br>"
+                + "<br>".join(f"{col}=%{{customdata[{j}]}}" for j, col in enumerate(hover_data))
+                + "<extra></extra>"
+            ),
+            name=name, legendgroup=name, offsetgroup=name, showlegend=False,
+            marker_color=color, boxpoints="all", jitter=0.3, pointpos=-1.8,
+            # The box of this trace would describe only the sample; hide it
+            fillcolor="rgba(0,0,0,0)", line=dict(width=0),
+            hoveron="points",
+        ))
+
+    n_shown = sum(len(g["outliers"]) for g in stats)
+    fig.update_layout(
+        annotations=[dict(
+            text=f"Boxes use all {total_rows or len(df):,} rows; points show a sample of "
+                 f"{min(len(df), sample_size):,} rows plus up to {BOX_MAX_OUTLIERS:,} outliers per group "
+                 f"({n_shown:,} outliers in total).",
+            xref="paper", yref="paper", x=0, y=1.08, showarrow=False, font=dict(size=11),
+        )]
+    )
+    return fig
@@ -0,0 +1,281 @@
+"""On-disk columnar cache for the student dataset.
+
+The CSV is converted once into one ``.npy`` file per column (integer codes for
+categoricals) plus a ``meta.json`` describing dtypes, categories and the CSV
+version it was built from. Loading memory-maps every column read-only, so all
+Streamlit sessions (and processes) share the same OS pages instead of holding
+their own copy of the frame.
+
+When rows are appended to the CSV, only the new bytes are parsed and their
+values are appended to the column files in place (``append_columnar``); a
+column is rewritten only if the new rows bring a new category or need a wider
+integer type, and then into a new file that the updated ``meta.json``
+publishes, so readers never pair codes with the wrong category list.
+
+Usage (ingest step):
+    python -m dashboard.columnar data/student_performance.csv
+"""
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from dashboard.loader import (
+    DATA_PATH,
+    appended_since,
+    file_version,
+    read_dataset,
+    read_tail,
+    recode,
+    source_fingerprint,
+    source_marker,
+    union_categories,
+)
+
+CACHE_DIR_NAME = ".cache"
+META_FILE = "meta.json"
+FORMAT_VERSION = 1
+
+
+def cache_path(csv_path=DATA_PATH, cache_dir=None):
+    # Default location: <csv dir>/.cache/<csv stem>/
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(csv_path)), CACHE_DIR_NAME)
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(cache_dir, stem)
+
+
+def _read_meta(target):
+    try:
+        with open(os.path.join(target, META_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_fresh(csv_path=DATA_PATH, cache_dir=None):
+    meta = _read_meta(cache_path(csv_path, cache_dir))
+    return (
+        meta is not None
+        and meta.get("format") == FORMAT_VERSION
+        and tuple(meta.get("source_version", ())) == file_version(csv_path)
+    )
+
+
+def _write_meta(target, meta):
+    # Readers trust meta["rows"], so it is swapped in only after the column
+    # files hold the rows it announces
+    fd, tmp = tempfile.mkstemp(prefix=".meta-", dir=target)
+    with os.fdopen(fd, "w") as f:
+        json.dump(meta, f, indent=1)
+    os.replace(tmp, os.path.join(target, META_FILE))
+
+
+def write_columnar(df, target, source_version=None, source_marker=None):
+    # Write into a temp dir next to the target and swap it in at the end, so a
+    # reader never sees a half-written cache.
+    parent = os.path.dirname(os.path.abspath(target))
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=".building-", dir=parent)
+
+    columns = []
+    for i, col in enumerate(df.columns):
+        series = df[col]
+        entry = {"name": col, "file": f"{i:03d}.npy"}
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            entry["kind"] = "category"
+            entry["categories"] = series.cat.categories.tolist()
+            entry["ordered"] = bool(series.cat.ordered)
+            values = series.cat.codes.to_numpy()
+        else:
+            entry["kind"] = "numeric"
+            values = series.to_numpy()
+        np.save(os.path.join(tmp, entry["file"]), values, allow_pickle=False)
+        columns.append(entry)
+
+    meta = {
+        "format": FORMAT_VERSION,
+        "rows": len(df),
+        "source_version": list(source_version) if source_version else None,
+        "source_marker": list(source_marker) if source_marker else None,
+        "columns": columns,
+    }
+    with open(os.path.join(tmp, META_FILE), "w") as f:
+        json.dump(meta, f, indent=1)
+
+    old = None
+    if os.path.exists(target):
+        old = tempfile.mkdtemp(prefix=".stale-", dir=parent)
+        os.replace(target, os.path.join(old, "cache"))
+    try:
+        os.replace(tmp, target)
+    except OSError:
+        # Another process finished its build first; keep theirs
+        shutil.rmtree(tmp, ignore_errors=True)
+    if old is not None:
+        shutil.rmtree(old, ignore_errors=True)
+    return target
+
+
+def build_columnar_cache(csv_path=DATA_PATH, cache_dir=None):
+    # Parse the CSV once and write the column files
+    version = file_version(csv_path)
+    df = read_dataset(csv_path)
+    # A file that changed during the parse gets no marker: the next load rebuilds
+    marker = source_marker(csv_path, version) if file_version(csv_path) == version else None
+    return write_columnar(df, cache_path(csv_path, cache_dir), version, marker)
+
+
+def _write_column_version(target, name, values):
+    """Write values to a new column file next to name and return its file name.
+
+    A rewritten column (recoded categories, wider dtype) must not replace the
+    file readers are using: the codes only make sense with the categories of
+    the meta.json they were read with. The new file is published by the next
+    _write_meta, and the old one is removed after that.
+    """
+    stem = os.path.splitext(name)[0].split("-")[0]
+    fd, path = tempfile.mkstemp(prefix=f"{stem}-", suffix=".npy", dir=target)
+    with os.fdopen(fd, "wb") as f:
+        np.save(f, values, allow_pickle=False)
+    return os.path.basename(path)
+
+
+def _append_npy(path, values, rows):
+    """Append values after the first rows entries of a 1-D .npy file, in place.
+
+    Returns False when it cannot be done in place (values need a wider dtype,
+    or the new shape no longer fits the header's padding).
+    """
+    with open(path, "r+b") as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            read_header, write_header = np.lib.format.read_array_header_1_0, np.lib.format.write_array_header_1_0
+        else:
+            read_header, write_header = np.lib.format.read_array_header_2_0, np.lib.format.write_array_header_2_0
+        shape, fortran_order, dtype = read_header(f)
+        header_len = f.tell()
+
+        if values.dtype != dtype:
+            if dtype.kind in "iu" and (values.dtype.kind not in "iu" or len(values) and (
+                values.min() < np.iinfo(dtype).min or values.max() > np.iinfo(dtype).max
+            )):
+                return False
+            values = values.astype(dtype)
+
+        header = io.BytesIO()
+        write_header(header, {"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False,
+                              "shape": (rows + len(values),)})
+        if len(header.getvalue()) != header_len:
+            return False
+
+        # Data first, then the header's new shape; a concurrent reader still
+        # sees the old, consistent prefix
+        f.seek(header_len + rows * dtype.itemsize)
+        f.truncate()
+        f.write(np.ascontiguousarray(values).tobytes())
+        f.seek(0)
+        f.write(header.getvalue())
+    return True
+
+
+def append_columnar(target, tail, source_version, source_marker):
+    """Extend the column files with the tail rows and update meta.json."""
+    meta = _read_meta(target)
+    rows = meta["rows"]
+    replaced = []
+    for entry in meta["columns"]:
+        path = os.path.join(target, entry["file"])
+        series = tail[entry["name"]]
+        rewritten = None
+        if entry["kind"] == "category":
+            categories = union_categories(entry["categories"], list(pd.Categorical(series).categories))
+            values = recode(series, categories)
+            if categories != entry["categories"]:
+                # New label: the stored codes change too, recode them against the sorted union
+                dtype = pd.CategoricalDtype(entry["categories"], ordered=entry["ordered"])
+                old = pd.Categorical.from_codes(np.load(path, mmap_mode="r")[:rows], dtype=dtype)
+                rewritten = np.concatenate([recode(old, categories), values])
+                entry["categories"] = categories
+        else:
+            values = series.to_numpy()
+        if rewritten is None and not _append_npy(path, values, rows):
+            rewritten = np.concatenate([np.load(path, mmap_mode="r")[:rows], values])
+        if rewritten is not None:
+            entry["file"] = _write_column_version(target, entry["file"], rewritten)
+            replaced.append(path)
+
+    meta["rows"] = rows + len(tail)
+    meta["source_version"] = list(source_version)
+    meta["source_marker"] = list(source_marker)
+    _write_meta(target, meta)
+    for path in replaced:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    return target
+
+
+def refresh_columnar_cache(csv_path=DATA_PATH, cache_dir=None):
+    """Bring the cache up to date: parse only appended rows if possible, else rebuild."""
+    target = cache_path(csv_path, cache_dir)
+    meta = _read_meta(target)
+    marker = tuple(meta["source_marker"]) if meta and meta.get("source_marker") else None
+    if meta is not None and meta.get("format") == FORMAT_VERSION and appended_since(csv_path, marker):
+        version = file_version(csv_path)
+        tail, end = read_tail(csv_path, marker[0])
+        try:
+            return append_columnar(target, tail, version, (end, source_fingerprint(csv_path, end)))
+        except (OSError, ValueError):
+            pass
+    return build_columnar_cache(csv_path, cache_dir)
+
+
+def read_columnar(target):
+    # Open the cache as a DataFrame whose columns are read-only memory maps
+    for attempt in range(3):
+        meta = _read_meta(target)
+        if meta is None:
+            raise FileNotFoundError(f"No columnar cache at {target}")
+        try:
+            return _open_columns(target, meta)
+        except FileNotFoundError:
+            # A column was replaced by an append between reading meta.json and
+            # opening its file: read the new meta.json
+            if attempt == 2:
+                raise
+
+
+def _open_columns(target, meta):
+    data = {}
+    for entry in meta["columns"]:
+        # Column files may already hold rows of an append in progress
+        values = np.load(os.path.join(target, entry["file"]), mmap_mode="r")[:meta["rows"]]
+        if entry["kind"] == "category":
+            dtype = pd.CategoricalDtype(entry["categories"], ordered=entry["ordered"])
+            values = pd.Categorical.from_codes(values, dtype=dtype)
+        data[entry["name"]] = pd.Series(values, copy=False)
+    return pd.DataFrame(data, copy=False)
+
+
+def load_columnar(csv_path=DATA_PATH, cache_dir=None, with_marker=False):
+    # Extend or rebuild automatically when the CSV changed since the cache was written
+    if not is_fresh(csv_path, cache_dir):
+        refresh_columnar_cache(csv_path, cache_dir)
+    target = cache_path(csv_path, cache_dir)
+    df = read_columnar(target)
+    if with_marker:
+        marker = _read_meta(target).get("source_marker")
+        return df, tuple(marker) if marker else None
+    return df
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else DATA_PATH
+    print("Columnar cache written to", build_columnar_cache(path))
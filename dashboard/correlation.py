@@ -0,0 +1,167 @@
+"""Correlation matrix from cached sufficient statistics.
+
+For every partition (School_Type value by default) we keep, over the numeric
+columns, the pairwise-complete count, sums, sums of squares and cross-products
+as k x k matrices. Any column subset and any union of partitions is then
+assembled in O(k^2) without touching the rows, and appended rows are folded in
+with ``update``. The result matches ``DataFrame.corr()`` (Pearson, pairwise
+complete observations).
+"""
+import copy
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from dashboard.memo import DatasetCache
+
+
+class CorrelationStats:
+    """Pairwise-complete sufficient statistics of one partition."""
+
+    def __init__(self, k):
+        self.n = np.zeros((k, k))      # rows where both i and j are present
+        self.s = np.zeros((k, k))      # sum of x_i over those rows
+        self.q = np.zeros((k, k))      # sum of x_i ** 2 over those rows
+        self.p = np.zeros((k, k))      # sum of x_i * x_j
+
+    def add(self, values):
+        # values: (rows, k) float array, already shifted, NaN = missing
+        present = ~np.isnan(values)
+        m = present.astype(float)
+        x = np.where(present, values, 0.0)
+        self.n += m.T @ m
+        self.s += x.T @ m
+        self.q += (x * x).T @ m
+        self.p += x.T @ x
+
+    def merge(self, other):
+        self.n += other.n
+        self.s += other.s
+        self.q += other.q
+        self.p += other.p
+        return self
+
+
+class CorrelationEngine:
+    def __init__(self, columns, partition_col=None, shift=None):
+        self.columns = list(columns)
+        self.position = {col: i for i, col in enumerate(self.columns)}
+        self.partition_col = partition_col
+        self.partitions = {}
+        # Sums are taken around a fixed per-column shift (e.g. the first batch's
+        # mean) to keep the one-pass formulas numerically stable
+        self.shift = None if shift is None else np.asarray(shift, dtype=float)
+
+    @classmethod
+    def from_frame(cls, df, columns=None, partition_col="School_Type"):
+        if columns is None:
+            columns = df.select_dtypes(include="number").columns.tolist()
+        engine = cls(columns, partition_col)
+        return engine.update(df)
+
+    def update(self, df):
+        """Fold (new) rows into the per-partition statistics."""
+        values = df[self.columns].to_numpy(dtype=float)
+        if self.shift is None:
+            with np.errstate(invalid="ignore"):
+                shift = np.nanmean(values, axis=0) if len(values) else np.zeros(len(self.columns))
+            self.shift = np.nan_to_num(shift)
+        values = values - self.shift
+
+        if self.partition_col is None:
+            keys, codes = [None], np.zeros(len(df), dtype=np.int64)
+        else:
+            cat = pd.Categorical(df[self.partition_col])
+            keys, codes = list(cat.categories), cat.codes
+        if self.partition_col is not None and (codes < 0).any():
+            # Rows without a partition value are kept under None (counted for
+            # partitions=None, excluded by any explicit selection, like isin)
+            keys, codes = keys + [None], np.where(codes < 0, len(keys), codes)
+        for i, key in enumerate(keys):
+            rows = codes == i
+            if not rows.any():
+                continue
+            stats = self.partitions.setdefault(key, CorrelationStats(len(self.columns)))
+            stats.add(values[rows])
+        return self
+
+    def stats(self, partitions=None):
+        total = CorrelationStats(len(self.columns))
+        for key, part in self.partitions.items():
+            if partitions is None or key in partitions:
+                total.merge(part)
+        return total
+
+    def corr(self, columns=None, partitions=None):
+        """Pearson correlation of columns over the union of partitions."""
+        columns = self.columns if columns is None else list(columns)
+        idx = [self.position[col] for col in columns]
+        total = self.stats(partitions)
+        n = total.n[np.ix_(idx, idx)]
+        s = total.s[np.ix_(idx, idx)]
+        q = total.q[np.ix_(idx, idx)]
+        p = total.p[np.ix_(idx, idx)]
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = n * p - s * s.T
+            var_i = n * q - s * s
+            var_j = var_i.T
+            corr = cov / np.sqrt(var_i * var_j)
+        corr[(n < 2) | (var_i <= 0) | (var_j <= 0)] = np.nan
+        corr = np.clip(corr, -1.0, 1.0)
+        diagonal = np.diag_indices(len(idx))
+        corr[diagonal] = np.where(np.isnan(corr[diagonal]), np.nan, 1.0)
+        return pd.DataFrame(corr, index=columns, columns=columns)
+
+
+def highlight_cells(corr, threshold):
+    """(column positions, row positions) of the cells with |r| >= threshold (NaN never matches)."""
+    with np.errstate(invalid="ignore"):
+        rows, cols = np.nonzero(np.abs(corr.to_numpy()) >= threshold)
+    return cols, rows
+
+
+def highlight_trace(corr, threshold, color="red", width=3):
+    """One line trace outlining every highlighted heatmap cell.
+
+    Replaces one layout shape per cell: each cell gets a closed rectangle
+    around its position (+-0.5 in data coordinates, so it stays on the cell
+    borders at any plot size or zoom), and the rectangles are separated by NaN
+    gaps. The heatmap must be drawn on positions, see heatmap_axes().
+    """
+    x, y = highlight_cells(corr, threshold)
+    corner_x = np.array([-0.5, 0.5, 0.5, -0.5, -0.5, np.nan])
+    corner_y = np.array([-0.5, -0.5, 0.5, 0.5, -0.5, np.nan])
+    return go.Scatter(
+        x=(x[:, None] + corner_x).ravel(),
+        y=(y[:, None] + corner_y).ravel(),
+        mode="lines",
+        line=dict(color=color, width=width),
+        hoverinfo="skip",
+        showlegend=False,
+    )
+
+
+def heatmap_axes(corr):
+    """Axes for a heatmap drawn at positions 0..k-1, labeled with the column names.
+
+    Square cells, no autorange padding from the overlay trace.
+    """
+    cells = [-0.5, len(corr.columns) - 0.5]
+    positions = np.arange(len(corr.columns))
+    return (
+        dict(side="bottom", range=cells, tickmode="array", tickvals=positions, ticktext=list(corr.columns)),
+        dict(range=cells, scaleanchor="x", tickmode="array", tickvals=positions, ticktext=list(corr.index)),
+    )
+
+
+# --> one engine per loaded dataset
+_engines = DatasetCache(max_entries=2)
+
+
+def get_correlation_engine(df, partition_col="School_Type"):
+    # After an append only the new rows are folded into a copy of the old sums
+    return _engines.get(df, ("corr", partition_col),
+                        lambda: CorrelationEngine.from_frame(df, partition_col=partition_col),
+                        extend=lambda engine, rows: copy.deepcopy(engine).update(rows))
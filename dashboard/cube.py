@@ -0,0 +1,202 @@
+"""Aggregation cube shared by the categorical charts.
+
+One pass over the rows fills a dense array with count, sum and sum of squares
+of a measure (Exam_Score) for every combination of the categorical dimensions
+used by the treemap, pie, Marimekko and Sankey charts. Each chart's aggregate
+is then a roll-up (sum over the other axes, optionally restricted to selected
+categories), which costs O(cells) and never touches the rows again.
+
+Every dimension gets one extra "missing" slot, so rows with a NaN category are
+counted in roll-ups over that dimension but, like groupby/isin, never appear
+as a group and never match a filter.
+"""
+import copy
+
+import numpy as np
+import pandas as pd
+
+from dashboard.backend import query_backend
+from dashboard.filters import derived_columns
+from dashboard.loader import union_categories
+from dashboard.marimekko import clip_sessions
+from dashboard.memo import DatasetCache
+
+CUBE_DIMENSIONS = [
+    "School_Type",
+    "Parental_Education_Level",
+    "Gender",
+    "Peer_Influence",
+    "Motivation_Level",
+    "Distance_from_Home",
+    "Tutoring_Group",
+    "Study_Hours_Group",
+    "Score_Level",
+]
+CUBE_MEASURE = "Exam_Score"
+
+
+class AggregationCube:
+    def __init__(self, df, dimensions, measure, backend=None):
+        self.dimensions = list(dimensions)
+        self.measure = measure
+        columns = {dim: pd.Categorical(df[dim]) for dim in self.dimensions}
+        self.categories = {dim: list(cat.categories) for dim, cat in columns.items()}
+        self.shape = tuple(len(self.categories[dim]) + 1 for dim in self.dimensions)
+        if backend is not None and backend.name != "pandas" and self.dimensions:
+            # One GROUP BY in the configured engine (dashboard/backend.py)
+            self._fill_groups(backend.group_stats(df, self.dimensions, measure))
+            return
+
+        codes = []
+        for dim, cat in columns.items():
+            code = cat.codes.astype(np.int64)
+            codes.append(np.where(code < 0, len(cat.categories), code))  # missing slot
+        cell = np.ravel_multi_index(codes, self.shape) if codes else np.zeros(len(df), dtype=np.int64)
+        n_cells = int(np.prod(self.shape))
+
+        values = df[measure].to_numpy(dtype=float)
+        present = ~np.isnan(values)
+        values = np.where(present, values, 0.0)
+        self.count = np.bincount(cell, minlength=n_cells).reshape(self.shape)
+        self.n_measure = np.bincount(cell, weights=present, minlength=n_cells).reshape(self.shape)
+        self.sum = np.bincount(cell, weights=values, minlength=n_cells).reshape(self.shape)
+        self.sumsq = np.bincount(cell, weights=values * values, minlength=n_cells).reshape(self.shape)
+
+    def _fill_groups(self, groups):
+        # Observed groups (missing keys included) -> the dense arrays
+        codes = []
+        for dim in self.dimensions:
+            code = pd.Categorical(groups[dim], categories=self.categories[dim]).codes.astype(np.int64)
+            codes.append(np.where(code < 0, len(self.categories[dim]), code))
+        cell = np.ravel_multi_index(codes, self.shape)
+        n_cells = int(np.prod(self.shape))
+        for name, column, dtype in [("count", "count", np.int64), ("n_measure", "n", float),
+                                    ("sum", "sum", float), ("sumsq", "sumsq", float)]:
+            array = np.zeros(n_cells, dtype=dtype)
+            np.add.at(array, cell, groups[column].to_numpy(dtype=dtype))
+            setattr(self, name, array.reshape(self.shape))
+
+    def update(self, df):
+        """Fold new rows into the cube (e.g. the next chunk of a streamed file).
+
+        Costs O(new rows + cells): the rows are binned straight into the
+        existing axes, which are only re-laid out when a category is new.
+        """
+        categories = {
+            dim: union_categories(self.categories[dim], list(pd.Categorical(df[dim]).categories))
+            for dim in self.dimensions
+        }
+        if categories != self.categories:
+            self._expand(categories)
+
+        codes = []
+        for dim in self.dimensions:
+            code = pd.Categorical(df[dim], categories=self.categories[dim]).codes.astype(np.int64)
+            codes.append(np.where(code < 0, len(self.categories[dim]), code))
+        cell = np.ravel_multi_index(codes, self.shape) if codes else np.zeros(len(df), dtype=np.int64)
+        n_cells = int(np.prod(self.shape))
+
+        values = df[self.measure].to_numpy(dtype=float)
+        present = ~np.isnan(values)
+        values = np.where(present, values, 0.0)
+        self.count = self.count + np.bincount(cell, minlength=n_cells).reshape(self.shape)
+        self.n_measure = self.n_measure + np.bincount(cell, weights=present, minlength=n_cells).reshape(self.shape)
+        self.sum = self.sum + np.bincount(cell, weights=values, minlength=n_cells).reshape(self.shape)
+        self.sumsq = self.sumsq + np.bincount(cell, weights=values * values, minlength=n_cells).reshape(self.shape)
+        return self
+
+    def _expand(self, categories):
+        # Re-lay the arrays out on the (larger) category axes; missing stays last
+        shape = tuple(len(categories[dim]) + 1 for dim in self.dimensions)
+        axes = [
+            np.array([categories[dim].index(c) for c in self.categories[dim]] + [len(categories[dim])])
+            for dim in self.dimensions
+        ]
+        for name in ["count", "n_measure", "sum", "sumsq"]:
+            array = np.zeros(shape, dtype=getattr(self, name).dtype)
+            array[np.ix_(*axes)] = getattr(self, name)
+            setattr(self, name, array)
+        self.categories, self.shape = categories, shape
+
+    def _slices(self, keep, where):
+        index = []
+        for dim in self.dimensions:
+            n = len(self.categories[dim])
+            if dim in where and where[dim] is not None:
+                allowed = set(where[dim])
+                positions = [i for i, c in enumerate(self.categories[dim]) if c in allowed]
+            elif dim in keep:
+                positions = list(range(n))        # groups never include missing
+            else:
+                positions = list(range(n + 1))    # all rows, missing included
+            index.append(np.asarray(positions, dtype=np.int64))
+        return index
+
+    def _reduce(self, array, keep, where):
+        index = self._slices(keep, where)
+        # Contiguous selections are plain slices (views); only filtered axes are gathered
+        filtered = [dim in where and where[dim] is not None for dim in self.dimensions]
+        sub = array[tuple(slice(None) if f else slice(0, len(positions))
+                          for f, positions in zip(filtered, index))]
+        for axis, positions in enumerate(index):
+            if filtered[axis]:
+                sub = np.take(sub, positions, axis=axis)
+        axes = tuple(i for i, dim in enumerate(self.dimensions) if dim not in keep)
+        sub = sub.sum(axis=axes)
+        # Reorder the remaining axes to the order asked for in keep
+        remaining = [dim for dim in self.dimensions if dim in keep]
+        sub = np.transpose(sub, [remaining.index(dim) for dim in keep])
+        labels = [[self.categories[dim][i] for i in index[self.dimensions.index(dim)]] for dim in keep]
+        return sub, labels
+
+    def table(self, keep, where=None, measure="count"):
+        """Dense roll-up over keep (an ndarray with one axis per kept dimension)."""
+        array = {"count": self.count, "sum": self.sum, "sumsq": self.sumsq, "n": self.n_measure}[measure]
+        return self._reduce(array, list(keep), where or {})
+
+    def rollup(self, keep, where=None):
+        """Observed groups of keep with count, sum, mean and std of the measure."""
+        keep, where = list(keep), where or {}
+        count, labels = self._reduce(self.count, keep, where)
+        n, _ = self._reduce(self.n_measure, keep, where)
+        total, _ = self._reduce(self.sum, keep, where)
+        sumsq, _ = self._reduce(self.sumsq, keep, where)
+
+        observed = np.nonzero(count)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = total / n
+            var = (sumsq - n * mean * mean) / (n - 1)
+        out = pd.DataFrame({
+            dim: pd.Categorical(np.asarray(labels[i], dtype=object)[observed[i]], categories=labels[i])
+            for i, dim in enumerate(keep)
+        })
+        out["count"] = count[observed]
+        out["sum"] = total[observed]
+        out["mean"] = mean[observed]
+        out["std"] = np.sqrt(np.maximum(var[observed], 0))
+        return out
+
+
+def cube_frame(df):
+    # The dataset columns plus the binned dimensions the charts group by
+    derived = derived_columns(df)
+    columns = {dim: df[dim] for dim in CUBE_DIMENSIONS if dim in df.columns}
+    columns["Tutoring_Group"] = clip_sessions(df["Tutoring_Sessions"])
+    columns["Study_Hours_Group"] = derived["Study_Hours_Group"]
+    columns["Score_Level"] = derived["Score_Level"]
+    columns[CUBE_MEASURE] = df[CUBE_MEASURE]
+    return pd.DataFrame({k: getattr(v, "array", v) for k, v in columns.items()})
+
+
+# --> one cube per loaded dataset
+_cubes = DatasetCache(max_entries=2)
+
+
+def get_cube(df):
+    # After an append only the new rows are folded in; update() replaces the
+    # arrays rather than writing into them, so a shallow copy keeps the old cube intact
+    return _cubes.get(
+        df, "cube",
+        lambda: AggregationCube(cube_frame(df), CUBE_DIMENSIONS, CUBE_MEASURE, query_backend()),
+        extend=lambda cube, rows: copy.copy(cube).update(cube_frame(rows))
+    )
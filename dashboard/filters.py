@@ -0,0 +1,234 @@
+"""Bitmap filter engine for the categorical multiselect filters.
+
+For every categorical column we build, once per dataset, one packed bitset per
+category (bit i set <=> row i has that category). A multiselect then resolves
+as an OR over the selected categories' bitsets and different columns combine
+with AND, all on packed uint8 words (rows / 8 bytes per operation). The last
+few resolved selections are memoized as packed bitsets, so repeating a filter
+combination costs a dict lookup, and only the selected rows are materialized
+at the end.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from dashboard.loader import CATEGORICAL_COLUMNS
+from dashboard.memo import DatasetCache
+
+# Binned columns used by the Sankey diagram, derived once per dataset
+SCORE_LEVEL_BINS = [0, 50, 75, 100]
+SCORE_LEVEL_LABELS = ["Low", "Medium", "High"]
+STUDY_HOURS_BINS = [0, 2, 5, 8, 12]
+STUDY_HOURS_LABELS = ["0-2", "2-5", "5-8", "8-12"]
+# Resolved selections kept per dataset (rows / 8 bytes each, ~1.2 MB at 10M rows);
+# the section cache already keeps the outputs built from them
+MAX_CACHED_MASKS = 8
+
+
+def derived_columns(df):
+    return {
+        "Score_Level": pd.cut(df["Exam_Score"], bins=SCORE_LEVEL_BINS, labels=SCORE_LEVEL_LABELS),
+        "Study_Hours_Group": pd.cut(df["Hours_Studied"], bins=STUDY_HOURS_BINS, labels=STUDY_HOURS_LABELS),
+    }
+
+
+class FilterIndex:
+    def __init__(self, df, columns=None, derived=None, max_cached=MAX_CACHED_MASKS):
+        self.df = df
+        self.n_rows = len(df)
+        self.derived = dict(derived or {})
+        self.categories = {}
+        self.bitsets = {}
+        self.has_missing = {}
+
+        if columns is None:
+            columns = [c for c in CATEGORICAL_COLUMNS if c in df.columns]
+        for col in list(columns) + list(self.derived):
+            self._index_column(col, self._column(col))
+
+        self._all_rows = np.full((self.n_rows + 7) // 8, 0xFF, dtype=np.uint8)
+        if self.n_rows % 8:
+            self._all_rows[-1] = (0xFF << (8 - self.n_rows % 8)) & 0xFF
+        self._resolved = OrderedDict()
+        self._max_cached = max_cached
+        self._lock = threading.Lock()
+
+    def _column(self, col):
+        if col in self.derived:
+            return self.derived[col]
+        return self.df[col]
+
+    def _index_column(self, col, series):
+        cat = pd.Categorical(series)
+        codes = np.asarray(cat.codes)
+        n_cats = len(cat.categories)
+        # (category, row) one-hot matrix, packed along the row axis
+        onehot = np.zeros((n_cats, self.n_rows), dtype=bool)
+        valid = codes >= 0
+        onehot[codes[valid], np.flatnonzero(valid)] = True
+        self.bitsets[col] = np.packbits(onehot, axis=1)
+        self.categories[col] = {value: i for i, value in enumerate(cat.categories)}
+        self.has_missing[col] = not valid.all()
+
+    def _column_mask(self, col, values):
+        lookup = self.categories[col]
+        codes = sorted({lookup[v] for v in values if v in lookup})
+        if not codes:
+            return np.zeros_like(self._all_rows)
+        # Every category selected and no missing values: the filter is a no-op
+        if len(codes) == len(lookup) and not self.has_missing[col]:
+            return None
+        if len(codes) == 1:
+            return self.bitsets[col][codes[0]]
+        return np.bitwise_or.reduce(self.bitsets[col][codes], axis=0)
+
+    def mask(self, selections):
+        """Packed bitset of the rows matching every (column -> allowed values) entry."""
+        key = tuple(sorted((col, frozenset(values)) for col, values in selections.items()
+                           if values is not None))
+        with self._lock:
+            if key in self._resolved:
+                self._resolved.move_to_end(key)
+                return self._resolved[key]
+
+        result = self._all_rows
+        for col, values in key:
+            col_mask = self._column_mask(col, values)
+            if col_mask is not None:
+                result = np.bitwise_and(result, col_mask)
+
+        with self._lock:
+            self._resolved[key] = result
+            if len(self._resolved) > self._max_cached:
+                self._resolved.popitem(last=False)
+        return result
+
+    def rows(self, selections):
+        # Row positions (sorted) of the matching rows
+        return np.flatnonzero(np.unpackbits(self.mask(selections), count=self.n_rows))
+
+    def select(self, selections):
+        # Materialize only the matching rows
+        return self.df.take(self.rows(selections))
+
+
+# --> one index per loaded dataset
+_filter_indexes = DatasetCache(max_entries=2)
+
+
+def get_filter_index(df):
+    return _filter_indexes.get(df, "filter", lambda: FilterIndex(df, derived=derived_columns(df)))
+
+
+# ----------------------------- RANGE INDEX ---------------------------------
+class RangeIndex:
+    """Sorted-column index for the numeric range sliders.
+
+    Each column keeps its argsort permutation, so a (low, high) range becomes
+    two searchsorted lookups and a slice of row ids. Several ranges are combined
+    by starting from the smallest candidate slice and checking only those rows
+    against the other ranges; full-range sliders are skipped entirely. Column min/max/mean are computed once here so the
+    sliders don't rescan the frame on every rerun.
+    """
+
+    def __init__(self, df, columns):
+        self.df = df
+        self.n_rows = len(df)
+        self.values = {}
+        self.order = {}
+        self.sorted_values = {}
+        self.stats = {}
+        for col in columns:
+            values = df[col].to_numpy()
+            order = np.argsort(values, kind="stable")
+            sorted_values = values[order]
+            # NaNs sort to the end; they never match a range filter
+            n_valid = self.n_rows
+            if sorted_values.dtype.kind == "f":
+                n_valid = int(np.count_nonzero(~np.isnan(sorted_values)))
+            self.values[col] = values
+            self.order[col] = order[:n_valid]
+            self.sorted_values[col] = sorted_values[:n_valid]
+            self.stats[col] = {
+                "count": n_valid,
+                "min": sorted_values[0].item() if n_valid else np.nan,
+                "max": sorted_values[n_valid - 1].item() if n_valid else np.nan,
+                "mean": float(sorted_values[:n_valid].mean()) if n_valid else np.nan,
+            }
+
+    def min(self, col):
+        return self.stats[col]["min"]
+
+    def max(self, col):
+        return self.stats[col]["max"]
+
+    def mean(self, col):
+        return self.stats[col]["mean"]
+
+    def _bounds(self, col, low, high):
+        # NaN bounds come from the min/max of an empty frame: nothing matches
+        if np.isnan(low) or np.isnan(high):
+            return 0, 0
+        sorted_values = self.sorted_values[col]
+        dtype = sorted_values.dtype
+        # The bounds are cast to the column dtype; a float bound against an int8
+        # column would otherwise make searchsorted convert the whole column.
+        if dtype.kind in "iu":
+            # x >= 2.5  <=>  x >= 3 for integer columns
+            info = np.iinfo(dtype)
+            low, high = np.ceil(low), np.floor(high)
+            if low > info.max or high < info.min or low > high:
+                return 0, 0
+            low, high = max(int(low), info.min), min(int(high), info.max)
+        low, high = dtype.type(low), dtype.type(high)
+        start = int(np.searchsorted(sorted_values, low, side="left"))
+        stop = int(np.searchsorted(sorted_values, high, side="right"))
+        return start, stop
+
+    def rows(self, ranges):
+        """Sorted row positions whose values fall in every (low, high) range."""
+        candidates = []
+        for col, (low, high) in ranges.items():
+            start, stop = self._bounds(col, low, high)
+            if start == 0 and stop == self.n_rows:
+                continue  # full range: not a filter
+            candidates.append((stop - start, col, start, stop))
+
+        if not candidates:
+            return np.arange(self.n_rows)
+
+        candidates.sort()
+        size, col, start, stop = candidates[0]
+        if size * 8 > self.n_rows:
+            # Wide ranges: gathering most of the rows by id costs more than one
+            # sequential pass over the columns that actually filter
+            keep = np.ones(self.n_rows, dtype=bool)
+            for _, col, _, _ in candidates:
+                low, high = ranges[col]
+                values = self.values[col]
+                keep &= (values >= low) & (values <= high)
+            return np.flatnonzero(keep)
+
+        rows = self.order[col][start:stop]
+        for _, col, start, stop in candidates[1:]:
+            if len(rows) == 0:
+                break
+            low, high = ranges[col]
+            values = self.values[col][rows]
+            rows = rows[(values >= low) & (values <= high)]
+        return np.sort(rows)
+
+    def select(self, ranges):
+        return self.df.take(self.rows(ranges))
+
+
+# --> range indexes are built per (dataset, section state), e.g. the parallel
+# coordinates frame for one School_Type selection, and reused while the user
+# drags the sliders
+_range_indexes = DatasetCache(max_entries=8)
+
+
+def get_range_index(df, key, build_frame, columns):
+    return _range_indexes.get(df, key, lambda: RangeIndex(build_frame(), columns))
@@ -0,0 +1,253 @@
+import hashlib
+import io
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from dashboard.memo import register_append
+
+DATA_PATH = "data/student_performance.csv"
+
+# ----------------------------- SCHEMA ---------------------------------
+# Every text column in the dataset is a small, fixed set of labels, so we keep
+# them as categoricals instead of Python string objects.
+CATEGORICAL_COLUMNS = [
+    "Parental_Involvement",
+    "Access_to_Resources",
+    "Extracurricular_Activities",
+    "Motivation_Level",
+    "Internet_Access",
+    "Family_Income",
+    "Teacher_Quality",
+    "School_Type",
+    "Peer_Influence",
+    "Learning_Disabilities",
+    "Parental_Education_Level",
+    "Distance_from_Home",
+    "Gender",
+]
+
+# Integer columns; they are parsed as int64 and then downcast to the smallest
+# integer type that holds the values actually present in the file.
+NUMERIC_COLUMNS = [
+    "Hours_Studied",
+    "Attendance",
+    "Sleep_Hours",
+    "Previous_Scores",
+    "Tutoring_Sessions",
+    "Physical_Activity",
+    "Exam_Score",
+]
+
+SCHEMA = {col: "category" for col in CATEGORICAL_COLUMNS}
+
+
+def file_version(path):
+    # mtime + size changes whenever the CSV is rewritten or appended to
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def apply_schema(df):
+    # Cast a raw frame (any source) to the dashboard schema
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and df[col].dtype.name != "category":
+            df[col] = df[col].astype("category")
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns and pd.api.types.is_integer_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], downcast="integer")
+    return df
+
+
+def read_dataset(path=DATA_PATH):
+    # Parse the CSV with the explicit schema (no caching)
+    df = pd.read_csv(path, dtype=SCHEMA)
+    return apply_schema(df)
+
+
+# ----------------------------- APPENDS ---------------------------------
+# New exam results are appended to the CSV. Every parse records how many bytes
+# it consumed (always up to a line break) plus a fingerprint of the file's head
+# and of the bytes just before that offset; if the file later is longer and the
+# fingerprint still matches, only the bytes after the offset need parsing.
+FINGERPRINT_BYTES = 4096
+
+
+def source_fingerprint(path, end):
+    with open(path, "rb") as f:
+        head = f.read(min(end, FINGERPRINT_BYTES))
+        f.seek(max(0, end - FINGERPRINT_BYTES))
+        before = f.read(end - max(0, end - FINGERPRINT_BYTES))
+    return hashlib.sha1(head + b"|" + before).hexdigest()
+
+
+def source_marker(path, version):
+    """(byte offset, fingerprint) of a parse of the whole file at version, or None.
+
+    None when the file does not end with a line break (the last row may still
+    be being written), so the next change falls back to a full parse.
+    """
+    end = version[1]
+    if end == 0:
+        return None
+    with open(path, "rb") as f:
+        f.seek(end - 1)
+        if f.read(1) != b"\n":
+            return None
+    return end, source_fingerprint(path, end)
+
+
+def appended_since(path, marker):
+    """True if the file is the parsed prefix (marker) plus new bytes."""
+    if marker is None:
+        return False
+    end, fingerprint = marker
+    return os.path.getsize(path) > end and source_fingerprint(path, end) == fingerprint
+
+
+def read_tail(path, offset):
+    """Typed frame of the complete rows after offset, and the new offset."""
+    with open(path, "rb") as f:
+        header = f.readline()
+        f.seek(offset)
+        data = f.read()
+    end = data.rfind(b"\n") + 1  # a half-written last line waits for the next refresh
+    tail = pd.read_csv(io.BytesIO(header + data[:end]), dtype=SCHEMA)
+    return apply_schema(tail), offset + end
+
+
+class _ByteWindow:
+    # Read-only file object over bytes [start, stop) of an open file
+    def __init__(self, f, start, stop):
+        f.seek(start)
+        self._f = f
+        self._left = stop - start
+
+    def read(self, size=-1):
+        size = self._left if size is None or size < 0 else min(size, self._left)
+        data = self._f.read(size)
+        self._left -= len(data)
+        return data
+
+    def __iter__(self):
+        return iter(self.read().splitlines(keepends=True))
+
+
+def complete_end(path, offset, block=1 << 16):
+    """Byte offset just past the last line break after offset (offset if there is none)."""
+    with open(path, "rb") as f:
+        position = f.seek(0, os.SEEK_END)
+        while position > offset:
+            start = max(offset, position - block)
+            f.seek(start)
+            data = f.read(position - start)
+            newline = data.rfind(b"\n")
+            if newline >= 0:
+                return start + newline + 1
+            position = start
+    return offset
+
+
+def read_tail_chunks(path, offset, end, chunk_rows):
+    """Typed frames of at most chunk_rows rows of the bytes [offset, end).
+
+    Unlike read_tail, the rows are parsed straight from the file one chunk at
+    a time, so memory stays bounded by a chunk however large the append is.
+    """
+    if end <= offset:
+        return
+    names = list(pd.read_csv(path, nrows=0).columns)
+    with open(path, "rb") as f:
+        window = _ByteWindow(f, offset, end)
+        for chunk in pd.read_csv(window, header=None, names=names, dtype=SCHEMA, chunksize=chunk_rows):
+            yield apply_schema(chunk)
+
+
+def union_categories(mine, theirs):
+    if all(c in mine for c in theirs):
+        return list(mine)
+    # Text categories stay sorted, as read_csv(dtype="category") orders them
+    try:
+        return sorted(set(mine) | set(theirs))
+    except TypeError:
+        return list(mine) + [c for c in theirs if c not in mine]
+
+
+def recode(values, categories):
+    """Codes of a categorical against categories (which contain all of its own)."""
+    values = pd.Categorical(values)
+    mapping = np.array([categories.index(c) for c in values.categories] + [-1], dtype=np.int64)
+    dtype = np.int8 if len(categories) < 2**7 else np.int16 if len(categories) < 2**15 else np.int32
+    return mapping[values.codes].astype(dtype)
+
+
+def append_rows(df, tail):
+    """df with the tail rows added below (categories are unioned, dtypes promoted)."""
+    data = {}
+    for col in df.columns:
+        old, new = df[col], tail[col]
+        if isinstance(old.dtype, pd.CategoricalDtype):
+            categories = union_categories(list(old.cat.categories), list(pd.Categorical(new).categories))
+            codes = np.concatenate([recode(old, categories), recode(new, categories)])
+            values = pd.Categorical.from_codes(codes, dtype=pd.CategoricalDtype(categories, ordered=old.cat.ordered))
+        else:
+            values = np.concatenate([old.to_numpy(), new.to_numpy()])
+        data[col] = pd.Series(values, copy=False)
+    return pd.DataFrame(data, copy=False)
+
+
+# --> CACHE: one parsed frame per (path, file version), plus the marker of the
+#     bytes it was parsed from
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def load_dataset(path=DATA_PATH, columnar=True):
+    """Return the typed dataset, parsing the CSV only when the file changed.
+
+    With ``columnar=True`` the frame is served from the memory-mapped cache in
+    dashboard.columnar (built on first use), falling back to a plain parse if
+    the cache directory is not writable. The frame is shared by every session,
+    so callers must not modify it in place (take a copy or a filtered slice
+    first).
+
+    When rows were only appended since the cached parse, just the new bytes
+    are parsed (the columnar cache is extended on disk, the in-memory frame
+    gets the rows added), and the new frame is registered as an extension of
+    the old one so derived caches can fold in the new rows only.
+    """
+    key = (os.path.abspath(path), columnar)
+    version = file_version(path)
+
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        df = None
+        marker = None
+        appended = cached is not None and appended_since(path, cached[2])
+        if columnar:
+            from dashboard.columnar import load_columnar
+            try:
+                df, marker = load_columnar(path, with_marker=True)
+            except OSError:
+                df = None
+        if df is None and appended:
+            tail, end = read_tail(path, cached[2][0])
+            df = append_rows(cached[1], tail)
+            marker = (end, source_fingerprint(path, end))
+        if df is None:
+            df = read_dataset(path)
+            marker = source_marker(path, version) if file_version(path) == version else None
+        if appended and len(df) >= len(cached[1]):
+            register_append(df, cached[1])
+        _cache[key] = (version, df, marker)
+        return df
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,49 @@
+"""Marimekko geometry for any two categorical columns.
+
+The counts table comes from the aggregation cube (dashboard/cube.py); bar
+shares and row (conditional) percentages are derived from it by broadcasting.
+"""
+import numpy as np
+import pandas as pd
+
+
+SESSION_LABELS = ["0", "1", "2", "3", "4+"]
+OTHER_LABEL = "Other"
+
+
+def clip_sessions(series, top=4):
+    """Tutoring_Sessions as '0'..'3' and '4+' (anything outside 0..3), 'Other' if missing."""
+    values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float)
+    codes = np.where((values >= 0) & (values < top), np.floor(values), top)
+    codes = np.where(np.isnan(values), top + 1, codes).astype(np.int64)
+    labels = [str(i) for i in range(top)] + [f"{top}+", OTHER_LABEL]
+    return pd.Categorical.from_codes(codes, categories=labels)
+
+
+def mekko_from_counts(counts, col_order=None):
+    """Marimekko geometry from a counts table (rows = bars, columns = segments).
+
+    Bars are ordered by descending size like value_counts(); bar widths are
+    the row shares, bar segments the row-conditional percentages.
+    """
+    row_totals = counts.sum(axis=1)
+    counts = counts[row_totals > 0]
+    counts = counts.loc[row_totals[row_totals > 0].sort_values(ascending=False, kind="stable").index]
+
+    totals = counts.to_numpy().sum(axis=1)
+    shares = totals / totals.sum()
+    x_starts = np.concatenate([[0.0], np.cumsum(shares)[:-1]])
+    conditional = counts.to_numpy() / totals[:, None] * 100
+
+    conditional = pd.DataFrame(conditional, index=counts.index, columns=counts.columns)
+    if col_order is not None:
+        conditional = conditional.reindex(columns=col_order, fill_value=0.0)
+    return {
+        "categories": counts.index.to_numpy(),
+        "counts": counts,
+        "shares": shares,
+        "share_percent": shares * 100,
+        "x_starts": x_starts,
+        "x_centers": x_starts + shares / 2,
+        "conditional": conditional,
+    }
@@ -0,0 +1,253 @@
+"""Caches for values derived from a loaded dataset.
+
+The loader hands out the same frame object until the CSV changes, so the
+frame identity (plus a hashable description of the filter state) is a cheap
+and safe cache key. Entries keep a reference to their frame, so an id() that
+gets reused by a later frame can never match a stale entry.
+"""
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+from plotly.basedatatypes import BaseFigure
+
+
+# A frame built by appending rows to a cached frame (dashboard.loader) is
+# registered with its parent, so caches can extend the parent's value with
+# the new rows instead of recomputing over the whole dataset
+_appends = {}
+_appends_lock = threading.Lock()
+
+
+def register_append(df, parent):
+    with _appends_lock:
+        for key, (child, _, _) in list(_appends.items()):
+            if child() is None:
+                del _appends[key]
+        _appends[id(df)] = (weakref.ref(df), weakref.ref(parent), len(parent))
+
+
+def appended_from(df):
+    """(parent frame, parent row count) if df is parent plus appended rows."""
+    with _appends_lock:
+        entry = _appends.get(id(df))
+    if entry is None or entry[0]() is not df:
+        return None
+    parent = entry[1]()
+    return None if parent is None else (parent, entry[2])
+
+
+class DatasetCache:
+    def __init__(self, max_entries=8):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, df, key, compute, extend=None):
+        """Cached value for (df, key).
+
+        extend(parent_value, new_rows), if given, derives the value from the
+        one cached for the frame df was appended to; it must not modify
+        parent_value, which sessions on the old frame may still be using.
+        """
+        cache_key = (id(df), key)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None and entry[0] is df:
+                self._entries.move_to_end(cache_key)
+                return entry[1]
+            lineage = appended_from(df) if extend is not None else None
+            if lineage is not None:
+                parent, parent_rows = lineage
+                parent_entry = self._entries.get((id(parent), key))
+                if parent_entry is not None and parent_entry[0] is parent:
+                    base = parent_entry[1]
+                    compute = lambda: extend(base, df.iloc[parent_rows:])
+
+        # Computed outside the lock; two sessions may race on a cold key, which
+        # only costs a duplicate computation
+        value = compute()
+        with self._lock:
+            self._entries[cache_key] = (df, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Built chart sections. Each section declares the widget values it reads; the
+# key is (section, frozen inputs), so a widget change only misses for the
+# sections that list it and every other section is served from here
+SECTION_MAX_ENTRIES = 128
+SECTION_MAX_BYTES = 256 * 2**20
+
+
+def freeze(value):
+    """Hashable form of a widget value (lists keep their order, sets do not)."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(freeze(v) for v in value)
+    if isinstance(value, np.ndarray):
+        return tuple(value.tolist())
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def approx_nbytes(value):
+    """Rough size of a cached section output (arrays, frames, figures, containers)."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = value.memory_usage(index=True, deep=False)
+        return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+    if isinstance(value, BaseFigure):
+        # Cached figures are not modified, so they are measured once
+        size = getattr(value, "_approx_nbytes", None)
+        if size is None:
+            size = value._approx_nbytes = approx_nbytes(value.to_plotly_json())
+        return size
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(approx_nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(approx_nbytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class SectionCache:
+    def __init__(self, max_entries=SECTION_MAX_ENTRIES, max_bytes=SECTION_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = {}
+        self.misses = {}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, df, section, inputs, compute):
+        cache_key = (id(df), section, freeze(inputs))
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None and entry[0] is df:
+                self._entries.move_to_end(cache_key)
+                self.hits[section] = self.hits.get(section, 0) + 1
+                return entry[1]
+            self.misses[section] = self.misses.get(section, 0) + 1
+
+        value = compute()
+        self._store(cache_key, df, value)
+        return value
+
+    def lookup(self, df, section, inputs):
+        """(True, output) if (df, section, inputs) is cached, else (False, None); not counted in the stats."""
+        cache_key = (id(df), section, freeze(inputs))
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is None or entry[0] is not df:
+                return False, None
+            self._entries.move_to_end(cache_key)
+            return True, entry[1]
+
+    def take(self, df, section, inputs):
+        """Like lookup, but removes the entry and counts the hit."""
+        cache_key = (id(df), section, freeze(inputs))
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is None or entry[0] is not df:
+                return False, None
+            del self._entries[cache_key]
+            self.nbytes -= entry[2]
+            self.hits[section] = self.hits.get(section, 0) + 1
+            return True, entry[1]
+
+    def put(self, df, section, inputs, value):
+        """Store a section output computed elsewhere (e.g. a pre-rendered snapshot)."""
+        self._store((id(df), section, freeze(inputs)), df, value)
+
+    def _store(self, cache_key, df, value):
+        size = approx_nbytes(value)
+        with self._lock:
+            old = self._entries.pop(cache_key, None)
+            if old is not None:
+                self.nbytes -= old[2]
+            # An output larger than the whole budget is returned but not kept
+            if size <= self.max_bytes:
+                self._entries[cache_key] = (df, value, size)
+                self.nbytes += size
+            while self._entries and (
+                len(self._entries) > self.max_entries or self.nbytes > self.max_bytes
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= evicted[2]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "nbytes": self.nbytes,
+                "hits": dict(self.hits),
+                "misses": dict(self.misses),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+            self.hits.clear()
+            self.misses.clear()
+
+
+_section_cache = SectionCache()
+
+# Sections built in the background for widget states nobody has picked yet
+# (dashboard/prefetch.py). They are kept apart, so guesses never evict what a
+# session is showing; when a rerun asks for one it moves to the section cache.
+PREFETCH_MAX_ENTRIES = 64
+PREFETCH_MAX_BYTES = 64 * 2**20
+_prefetch_cache = SectionCache(PREFETCH_MAX_ENTRIES, PREFETCH_MAX_BYTES)
+_speculative = threading.local()
+
+
+@contextmanager
+def speculative():
+    """Sections computed inside this block (on this thread) go to the prefetch cache."""
+    _speculative.active = True
+    try:
+        yield
+    finally:
+        _speculative.active = False
+
+
+def get_section(df, section, inputs, compute):
+    """Output of a chart section, rebuilt only when one of its inputs changes."""
+    if getattr(_speculative, "active", False):
+        for cache in (_section_cache, _prefetch_cache):
+            found, value = cache.lookup(df, section, inputs)
+            if found:
+                return value
+        value = compute()
+        _prefetch_cache.put(df, section, inputs, value)
+        return value
+
+    def prefetched_or_compute():
+        found, value = _prefetch_cache.take(df, section, inputs)
+        return value if found else compute()
+    return _section_cache.get(df, section, inputs, prefetched_or_compute)
+
+
+def section_cache():
+    return _section_cache
+
+
+def prefetch_cache():
+    return _prefetch_cache
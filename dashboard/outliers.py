@@ -0,0 +1,132 @@
+"""IQR outlier filter for the Parallel Coordinates "Remove Outliers" toggle.
+
+All columns are handled at once: their quartiles come from one ``np.quantile``
+call over a (rows, columns) array (or, for the small-range integer columns of
+this dataset, one ``np.bincount`` over all of them), and a single combined mask keeps the rows
+inside every column's Tukey fences, so the result no longer depends on the
+column order. ``sequential=True`` reproduces the old column-by-column trimming
+(each column's quartiles taken after the previous columns were trimmed) with
+masks instead of intermediate copies.
+
+For large or streamed data the fences can come from quantile sketches
+(``PartitionedSketches``) merged for the current School_Type selection instead
+of the rows; the fences are cached per dataset and filter state either way.
+"""
+import numpy as np
+import pandas as pd
+
+from dashboard.memo import DatasetCache
+from dashboard.sketch import PartitionedSketches
+
+IQR_COLUMNS = ["Hours_Studied", "Attendance", "Sleep_Hours", "Previous_Scores", "Exam_Score"]
+IQR_K = 1.5
+# Above this many rows the fences come from per-School_Type sketches, which
+# answer every school selection without rescanning the rows
+IQR_SKETCH_ROWS = 1_000_000
+COUNTING_MAX_SPAN = 1 << 16
+
+
+def _numeric(df, columns):
+    return [col for col in columns if col in df.columns and pd.api.types.is_numeric_dtype(df[col])]
+
+
+def counting_quantiles(values, q):
+    """np.quantile(values, q, axis=0) for a 2-D integer array, by counting.
+
+    One bincount over all columns (each column offset into its own value
+    range) replaces the per-column partial sorts; exact, same interpolation.
+    """
+    q = np.asarray(q, dtype=float)
+    low = values.min(axis=0).astype(np.int64)
+    span = values.max(axis=0).astype(np.int64) - low + 1
+    offset = np.concatenate([[0], np.cumsum(span)[:-1]])
+    counts = np.bincount((values.astype(np.int64) - low + offset).ravel(), minlength=int(span.sum()))
+
+    position = (len(values) - 1) * q
+    below = np.floor(position)
+    out = np.empty((len(q), values.shape[1]))
+    for j in range(values.shape[1]):
+        cum = np.cumsum(counts[offset[j]:offset[j] + span[j]])
+        lo = np.searchsorted(cum, below, side="right")
+        hi = np.minimum(np.searchsorted(cum, below + 1, side="right"), span[j] - 1)
+        out[:, j] = low[j] + lo + (position - below) * (hi - lo)
+    return out
+
+
+def iqr_bounds(df, columns=IQR_COLUMNS, k=IQR_K):
+    """{column: (lower, upper)} from one quantile pass over all columns."""
+    columns = _numeric(df, columns)
+    if not columns:
+        return {}
+    if len(df) == 0:
+        return {col: (np.nan, np.nan) for col in columns}
+    values = df[columns].to_numpy()
+    if values.dtype.kind in "iu" and int(values.max()) - int(values.min()) < COUNTING_MAX_SPAN:
+        # Small-range integer columns (all of IQR_COLUMNS): count instead of sort
+        q1, q3 = counting_quantiles(values, [0.25, 0.75])
+    else:
+        values = values.astype(float)
+        quantile = np.nanquantile if np.isnan(values).any() else np.quantile
+        with np.errstate(invalid="ignore"):
+            q1, q3 = quantile(values, [0.25, 0.75], axis=0)
+    iqr = q3 - q1
+    return {col: (q1[i] - k * iqr[i], q3[i] + k * iqr[i]) for i, col in enumerate(columns)}
+
+
+def sketch_iqr_bounds(sketches, columns=IQR_COLUMNS, where=None, k=IQR_K):
+    """Approximate fences from quantile sketches, restricted to the rows in where."""
+    bounds = {}
+    for col in columns:
+        q1, q3 = sketches.sketch(col, where).quantile([0.25, 0.75])
+        bounds[col] = (q1 - k * (q3 - q1), q3 + k * (q3 - q1))
+    return bounds
+
+
+def inlier_mask(df, bounds):
+    """True for rows inside the fences of every column (NaN counts as outside)."""
+    if not bounds:
+        return np.ones(len(df), dtype=bool)
+    columns = list(bounds)
+    values = df[columns].to_numpy(dtype=float)
+    lower = np.array([bounds[col][0] for col in columns])
+    upper = np.array([bounds[col][1] for col in columns])
+    return ((values >= lower) & (values <= upper)).all(axis=1)
+
+
+def trim_outliers(df, columns=IQR_COLUMNS, k=IQR_K, sequential=False, bounds=None):
+    """Rows of df inside the IQR fences (a filtered slice, df is not copied)."""
+    if bounds is None and sequential:
+        keep = np.ones(len(df), dtype=bool)
+        for col in _numeric(df, columns):
+            values = df[col].to_numpy(dtype=float)
+            with np.errstate(invalid="ignore"):
+                q1, q3 = np.nanquantile(values[keep], [0.25, 0.75]) if keep.any() else (np.nan, np.nan)
+            keep &= (values >= q1 - k * (q3 - q1)) & (values <= q3 + k * (q3 - q1))
+        return df[keep]
+    if bounds is None:
+        bounds = iqr_bounds(df, columns, k)
+    return df[inlier_mask(df, bounds)]
+
+
+def partition_sketches(df, columns=IQR_COLUMNS, partitions=("School_Type",)):
+    return PartitionedSketches(_numeric(df, columns), partitions).update(df)
+
+
+# --> sketches per dataset, fences per (dataset, filter state)
+_sketches = DatasetCache(max_entries=2)
+_bounds = DatasetCache(max_entries=16)
+
+
+def get_iqr_bounds(df, where, data, columns=IQR_COLUMNS, sketches=None):
+    """Fences for data, the rows of df selected by where (e.g. {"School_Type": [...]}).
+
+    Exact (one np.quantile over data) up to IQR_SKETCH_ROWS rows; above that,
+    or when sketches are passed (streaming mode), merged from quantile sketches.
+    """
+    if sketches is None and len(df) > IQR_SKETCH_ROWS:
+        sketches = _sketches.get(df, "iqr_sketches", lambda: partition_sketches(df, columns))
+    key = ("iqr", tuple(columns), sketches is not None,
+           tuple(sorted((col, frozenset(values)) for col, values in where.items())))
+    if sketches is not None:
+        return _bounds.get(df, key, lambda: sketch_iqr_bounds(sketches, columns, where))
+    return _bounds.get(df, key, lambda: iqr_bounds(data, columns))
@@ -0,0 +1,133 @@
+"""Builds the chart sections concurrently and renders them in page order.
+
+Streamlit widgets have to be created on the script thread, in order, but the
+figure builders only read widget values that are already known. app.py
+therefore submits each section as soon as its widgets are read, reserves a
+container at the section's place on the page, and fills the containers in
+order at the end of the script.
+
+Configuration (environment variables):
+
+    DASHBOARD_WORKERS    number of section builders running at once (default 4,
+                         1 = build sequentially on the script thread)
+    DASHBOARD_EXECUTOR   "thread" (default) or "process"; with "process" the
+                         heavy aggregations passed to aggregate() run in worker
+                         processes that memory-map the dataset themselves
+"""
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+from dashboard.loader import load_dataset
+from dashboard.memo import get_section
+
+DEFAULT_WORKERS = 4
+EXECUTORS = ("thread", "process")
+
+
+def pipeline_config():
+    workers = max(1, int(os.environ.get("DASHBOARD_WORKERS", DEFAULT_WORKERS)))
+    kind = os.environ.get("DASHBOARD_EXECUTOR", "thread")
+    if kind not in EXECUTORS:
+        raise ValueError(f"DASHBOARD_EXECUTOR must be one of {EXECUTORS}, got {kind!r}")
+    return workers, kind
+
+
+# Pools live for the whole server process; starting threads (or worse,
+# processes) on every rerun would cost more than the builds they run
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _pool(kind, workers):
+    with _pools_lock:
+        pool = _pools.get((kind, workers))
+        if pool is None:
+            if kind == "process":
+                pool = ProcessPoolExecutor(max_workers=workers)
+            else:
+                pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="section")
+            _pools[(kind, workers)] = pool
+        return pool
+
+
+def _call(compute):
+    future = Future()
+    try:
+        future.set_result(compute())
+    except BaseException as exc:
+        future.set_exception(exc)
+    return future
+
+
+def _on_dataset(path, func, args, kwargs):
+    # Runs in a worker process: the dataset is memory-mapped from the columnar
+    # cache, so each process shares the page cache instead of re-parsing the CSV
+    return func(load_dataset(path), *args, **kwargs)
+
+
+class SectionPipeline:
+    def __init__(self, df, path, workers=None, kind=None, trace=None):
+        config_workers, config_kind = pipeline_config()
+        self.df = df
+        self.path = os.path.abspath(path)
+        self.workers = workers or config_workers
+        self.kind = kind or config_kind
+        self.trace = trace
+        if trace is not None and trace.profiling:
+            # Profilers only see the script thread
+            self.workers = 1
+        self._sections = []
+        # Widget values of every section submitted in this rerun (read by dashboard.prefetch)
+        self.inputs = {}
+
+    def _executor(self, kind):
+        if self.workers <= 1:
+            return None
+        return _pool(kind, self.workers)
+
+    def submit(self, section, inputs, build, render):
+        """Start build(**inputs) as a memoized section; render(output) runs in finish().
+
+        The widget values reach the builder as arguments, bound at submit
+        time, so a builder still running never sees a global the script has
+        reassigned further down. Builders always run on threads: they close
+        over app state that cannot be pickled, and most of their time is spent
+        in pandas/NumPy code that releases the GIL.
+        """
+        executor = self._executor("thread")
+        self.inputs[section] = inputs
+        record = self.trace.section(section) if self.trace is not None else None
+
+        def run():
+            if record is None:
+                return build(**inputs)
+            with self.trace.building(record):
+                return build(**inputs)
+
+        compute = lambda: get_section(self.df, section, inputs, run)
+        future = _call(compute) if executor is None else executor.submit(compute)
+        self._sections.append((future, render, record))
+        return future
+
+    def aggregate(self, func, *args, **kwargs):
+        """Future of func(df, *args, **kwargs).
+
+        func must be a module-level function with picklable arguments; with the
+        process executor it runs in a worker process on that process's own
+        memory-mapped copy of the dataset. Otherwise it runs in the calling
+        thread, which is already a section worker (queueing it on the same
+        thread pool could deadlock once every worker waits on an aggregate).
+        """
+        if self.kind == "process" and self.workers > 1:
+            return self._executor("process").submit(_on_dataset, self.path, func, args, kwargs)
+        return _call(lambda: func(self.df, *args, **kwargs))
+
+    def finish(self):
+        """Render every submitted section in submission (page) order."""
+        sections, self._sections = self._sections, []
+        for future, render, record in sections:
+            if record is None:
+                render(future.result())
+            else:
+                self.trace.render(record, future.result(), render)
@@ -0,0 +1,238 @@
+"""Background warm-up of the filter states a user is likely to pick next.
+
+Filter changes are usually one click: a School_Type, Gender, Motivation level
+or Score level is added to or removed from a multiselect. After each rerun
+app.py hands the section inputs it just rendered to ``prefetcher().schedule``,
+which builds the affected sections for every such one-click neighbour on a
+single background thread, inside ``memo.speculative()``: the outputs go to the
+bounded prefetch cache (dashboard/memo.py), and the rerun that asks for one of
+them takes it from there instead of building it.
+
+The neighbour states are the ones Streamlit would produce: an added option is
+appended to the selection, and widgets whose options or bounds follow the
+school filter (the Sankey motivation filter, the parallel-coordinates sliders)
+are reset to their defaults when those change.
+
+Configuration (environment variables):
+
+    DASHBOARD_PREFETCH          "0" turns the warm-up off
+    DASHBOARD_PREFETCH_BUDGET   CPU seconds spent per rerun at most (default 2)
+    DASHBOARD_PREFETCH_SHARE    fraction of one CPU the warm-up may use while
+                                it runs (default 0.5; it sleeps in between)
+
+A rerun of the same session cancels the warm-up of the previous one; the
+section being built finishes (and stays cached), the rest are skipped.
+"""
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dashboard.filters import SCORE_LEVEL_LABELS
+from dashboard.memo import freeze, get_section, speculative
+from dashboard.sections import build_box, build_heatmap, build_parallel, build_pie, build_sankey
+
+DEFAULT_BUDGET_S = 2.0
+DEFAULT_SHARE = 0.5
+# Sections whose inputs include a prefetched filter
+PREFETCH_BUILDERS = {
+    "box": build_box,
+    "parallel": build_parallel,
+    "heatmap": build_heatmap,
+    "sankey": build_sankey,
+    "pie": build_pie,
+}
+# Parallel-coordinates slider -> column (the motivation column depends on the dataset)
+PARALLEL_SLIDERS = {
+    "hours_range": "Hours_Studied",
+    "attendance_range": "Attendance",
+    "sleep_range": "Sleep_Hours",
+    "motivation_range": None,
+}
+
+
+def prefetch_config():
+    enabled = os.environ.get("DASHBOARD_PREFETCH", "1").lower() not in ("0", "false", "no")
+    budget_s = float(os.environ.get("DASHBOARD_PREFETCH_BUDGET", DEFAULT_BUDGET_S))
+    share = float(os.environ.get("DASHBOARD_PREFETCH_SHARE", DEFAULT_SHARE))
+    if not 0 < share <= 1:
+        raise ValueError(f"DASHBOARD_PREFETCH_SHARE must be in (0, 1], got {share}")
+    return enabled, budget_s, share
+
+
+def motivation_options(data, school_option):
+    # Options of the Sankey motivation filter (app.py reads them from the filtered rows)
+    return sorted(data.filtered(school_option)["Motivation_Level"].unique())
+
+
+def widget_options(data, widgets):
+    """Options of the prefetched multiselects, in page order."""
+    return {
+        "school_option": list(data.df["School_Type"].unique()),
+        "selected_genders": list(data.df["Gender"].unique()),
+        "motivation_filter": lambda: motivation_options(data, widgets["school_option"]),
+        "score_filter": list(SCORE_LEVEL_LABELS),
+    }
+
+
+def toggles(selection, options):
+    """Selections one click away: one option removed, or one appended (never empty)."""
+    selection = list(selection)
+    for option in selection:
+        if len(selection) > 1:
+            yield [v for v in selection if v != option]
+    for option in options:
+        if option not in selection:
+            yield selection + [option]
+
+
+def _parallel_bounds(data, widgets, school_option):
+    index = data.parallel_index(school_option, widgets["remove_outliers"])
+    return {
+        slider: (float(index.min(column or data.motivation_col)), float(index.max(column or data.motivation_col)))
+        for slider, column in PARALLEL_SLIDERS.items()
+    }
+
+
+def follow(data, widgets, name, value):
+    """Widget values after name changes to value.
+
+    Keyless widgets are recreated (at their default) when their options or
+    bounds change, so the ones derived from the school filter are reset.
+    """
+    after = dict(widgets, **{name: value})
+    if name != "school_option":
+        return after
+    if "motivation_filter" in widgets:
+        options = motivation_options(data, value)
+        if options != motivation_options(data, widgets["school_option"]):
+            after["motivation_filter"] = options
+    if "hours_range" in widgets:
+        before = _parallel_bounds(data, widgets, widgets["school_option"])
+        for slider, bounds in _parallel_bounds(data, widgets, value).items():
+            if bounds != before[slider]:
+                after[slider] = bounds
+    return after
+
+
+def neighbour_states(data, current):
+    """(widget, value, {section: inputs}) for every one-click change of the current state.
+
+    current is {section: inputs} as submitted by app.py; only the sections
+    whose inputs change are listed.
+    """
+    current = {section: inputs for section, inputs in current.items() if section in PREFETCH_BUILDERS}
+    widgets = {}
+    for inputs in current.values():
+        widgets.update(inputs)
+    for name, options in widget_options(data, widgets).items():
+        if name not in widgets:
+            continue
+        for value in toggles(widgets[name], options() if callable(options) else options):
+            after = follow(data, widgets, name, value)
+            changed = {}
+            for section, inputs in current.items():
+                neighbour = {key: after[key] for key in inputs}
+                if neighbour != inputs:
+                    changed[section] = neighbour
+            yield name, value, changed
+
+
+def neighbour_sections(data, current):
+    """Every (section, inputs) of neighbour_states, once each."""
+    seen = set()
+    for _, _, changed in neighbour_states(data, current):
+        for section, inputs in changed.items():
+            key = (section, freeze(inputs))
+            if key not in seen:
+                seen.add(key)
+                yield section, inputs
+
+
+class Prefetcher:
+    def __init__(self, budget_s=None, share=None):
+        _, config_budget, config_share = prefetch_config()
+        self.budget_s = config_budget if budget_s is None else budget_s
+        self.share = share or config_share
+        self.stats = {"scheduled": 0, "built": 0, "cancelled": 0, "over_budget": 0, "failed": 0}
+        # session -> generation of its pending warm-up; an entry lives only
+        # until that warm-up ends or is cancelled
+        self._generations = {}
+        self._next_generation = itertools.count(1)
+        self._lock = threading.Lock()
+        # One thread for every session: the warm-up never takes more than one core
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+
+    def cancel(self, session):
+        """Stop the warm-up scheduled by session's previous rerun."""
+        with self._lock:
+            self._generations.pop(session, None)
+
+    def schedule(self, session, data, current):
+        """Warm the neighbours of current ({section: inputs} of this rerun) in the background."""
+        with self._lock:
+            # Generations are unique across sessions, so a superseded warm-up
+            # never becomes live again once its session's entry is dropped
+            generation = self._generations[session] = next(self._next_generation)
+            self.stats["scheduled"] += 1
+        return self._pool.submit(self._run, session, generation, data, current)
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _live(self, session, generation):
+        return self._generations.get(session) == generation
+
+    def _run(self, session, generation, data, current):
+        try:
+            return self._warm(session, generation, data, current)
+        finally:
+            with self._lock:
+                if self._generations.get(session) == generation:
+                    del self._generations[session]
+
+    def _warm(self, session, generation, data, current):
+        start = time.thread_time()
+        built = 0
+        if not self._live(session, generation):
+            # Queued behind other sessions' work and superseded meanwhile
+            self._count("cancelled")
+            return built
+        with speculative():
+            for section, inputs in neighbour_sections(data, current):
+                if not self._live(session, generation):
+                    self._count("cancelled")
+                    return built
+                if time.thread_time() - start > self.budget_s:
+                    self._count("over_budget")
+                    return built
+                started = time.perf_counter()
+                try:
+                    get_section(data.df, section, inputs, lambda: PREFETCH_BUILDERS[section](data, **inputs))
+                except Exception:
+                    # A guess that cannot be built is simply not cached; the rerun
+                    # that asks for it reports the error
+                    self._count("failed")
+                    continue
+                built += 1
+                self._count("built")
+                # Leave the rest of the CPU to the reruns
+                time.sleep((time.perf_counter() - started) * (1 - self.share) / self.share)
+        return built
+
+
+_prefetcher = None
+_prefetcher_lock = threading.Lock()
+
+
+def prefetcher():
+    """The server's Prefetcher, or None when DASHBOARD_PREFETCH=0."""
+    global _prefetcher
+    if not prefetch_config()[0]:
+        return None
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = Prefetcher()
+        return _prefetcher
@@ -0,0 +1,301 @@
+"""Per-rerun timing of the dashboard's hot paths.
+
+Every rerun of app.py gets a ``RerunTrace``. The pipeline records, per chart
+section, whether it came from the section cache and where its time went:
+
+    prep_s      data preparation (pandas/NumPy) inside the section builder
+    figure_s    figure construction, from the builder's stage("figure") on
+    render_s    st.plotly_chart, which serializes the figure to JSON
+    payload     size of that JSON (measured once per built figure)
+
+plus the wall time of the whole rerun, the load phase, the memory of the
+frames it registers and the peak RSS of the process. Timing is a handful of
+perf_counter calls per section and is always on. The rest is opt-in
+(environment variables):
+
+    DASHBOARD_TRACE         append one row per section and rerun to this file
+                            (.csv, anything else is JSON lines)
+    DASHBOARD_DEBUG=1       show the numbers in a sidebar panel (also ?debug=1)
+    DASHBOARD_PROFILE=1     allow on-demand profiles: a rerun is profiled when
+                            the page is opened with ?profile=1 (cProfile) or
+                            ?profile=pyinstrument, with the sections built
+                            sequentially so the profiler sees them (without
+                            it the query parameter is ignored, so visitors
+                            cannot make the server profile and write files)
+    DASHBOARD_PROFILE_DIR   where those profiles are written (default "profiles")
+
+Traces from many sessions can be summarized with
+
+    python -m dashboard.profiling trace.jsonl [trace2.csv ...]
+"""
+import argparse
+import cProfile
+import csv
+import io
+import json
+import os
+import pstats
+import resource
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import pandas as pd
+
+PROFILE_DIR = "profiles"
+PROFILERS = ("cprofile", "pyinstrument")
+TRACE_FIELDS = [
+    "run_id", "timestamp", "session", "rerun_s", "load_s", "rows", "df_bytes", "max_rss_bytes",
+    "section", "cached", "prep_s", "figure_s", "render_s", "payload_bytes",
+]
+
+_local = threading.local()
+_export_lock = threading.Lock()
+
+
+def _flag(name):
+    return os.environ.get(name, "").lower() in ("1", "true", "yes")
+
+
+def _profiler_name(value):
+    if value in (None, "", "0", "false"):
+        return None
+    return value if value in PROFILERS else "cprofile"
+
+
+def figure_payload_bytes(fig):
+    """Bytes of the JSON Streamlit sends for fig (serialized once, then remembered)."""
+    size = getattr(fig, "_payload_bytes", None)
+    if size is None:
+        import plotly.io
+
+        size = len(plotly.io.to_json(fig, validate=False))
+        fig._payload_bytes = size
+    return size
+
+
+class RerunTrace:
+    def __init__(self, session=None, debug=False, export=None, profile=None):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.timestamp = time.time()
+        self.session = session
+        self.debug = debug
+        self.export = export
+        self.rerun_s = None
+        self.load_s = None
+        self.frames = {}
+        self.sections = {}
+        self.profile_output = None
+        self.profile_path = None
+        self._start = time.perf_counter()
+        self._profiler = None
+        self._start_profiler(profile)
+
+    @property
+    def profiling(self):
+        return self._profiler is not None
+
+    @property
+    def measure_payload(self):
+        # Payload sizes cost one extra serialization per built figure, so they
+        # are only measured when someone looks at them
+        return self.debug or bool(self.export) or self.profiling
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            setattr(self, f"{name}_s", time.perf_counter() - start)
+
+    def frame(self, name, df):
+        self.frames[name] = (len(df), int(df.memory_usage(index=True, deep=False).sum()))
+
+    def section(self, name):
+        record = {"section": name, "cached": True, "prep_s": 0.0, "figure_s": 0.0,
+                  "render_s": 0.0, "payload_bytes": None}
+        self.sections[name] = record
+        return record
+
+    @contextmanager
+    def building(self, record):
+        """Time a section build on the current thread, split by stage()."""
+        record["cached"] = False
+        previous = getattr(_local, "stage", None)
+        _local.stage = [record, "prep", time.perf_counter()]
+        try:
+            yield
+        finally:
+            _stage_switch(None)
+            _local.stage = previous
+
+    def render(self, record, output, render):
+        start = time.perf_counter()
+        render(output)
+        record["render_s"] = time.perf_counter() - start
+        if self.measure_payload:
+            fig = output[0] if isinstance(output, tuple) else output
+            record["payload_bytes"] = figure_payload_bytes(fig)
+
+    def finish(self):
+        self.rerun_s = time.perf_counter() - self._start
+        self._stop_profiler()
+        if self.export:
+            export_trace(self.export, self.rows())
+        return self
+
+    def rows(self):
+        rows, df_bytes = self.frames.get("df", (None, None))
+        # ru_maxrss is in KiB on Linux (bytes on macOS)
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+        base = {"run_id": self.run_id, "timestamp": round(self.timestamp, 3), "session": self.session,
+                "rerun_s": self.rerun_s, "load_s": self.load_s, "rows": rows, "df_bytes": df_bytes,
+                "max_rss_bytes": rss}
+        return [{**base, **record} for record in self.sections.values()]
+
+    def _start_profiler(self, name):
+        name = _profiler_name(name)
+        if name == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                self.profile_output = "pyinstrument is not installed; profiled with cProfile instead.\n"
+                name = "cprofile"
+            else:
+                self._profiler = Profiler()
+                self._profiler.start()
+                return
+        if name == "cprofile":
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def _stop_profiler(self):
+        if self._profiler is None:
+            return
+        profiler, self._profiler = self._profiler, None
+        directory = os.environ.get("DASHBOARD_PROFILE_DIR", PROFILE_DIR)
+        os.makedirs(directory, exist_ok=True)
+        stem = os.path.join(directory, f"rerun-{time.strftime('%Y%m%d-%H%M%S')}-{self.run_id}")
+        note = self.profile_output or ""
+        if isinstance(profiler, cProfile.Profile):
+            profiler.disable()
+            self.profile_path = stem + ".prof"
+            profiler.dump_stats(self.profile_path)
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(25)
+            self.profile_output = note + out.getvalue()
+        else:
+            profiler.stop()
+            self.profile_path = stem + ".html"
+            with open(self.profile_path, "w") as f:
+                f.write(profiler.output_html())
+            self.profile_output = note + profiler.output_text(unicode=False, color=False)
+
+
+def _stage_switch(stage):
+    current = getattr(_local, "stage", None)
+    if current is None:
+        return
+    record, name, start = current
+    now = time.perf_counter()
+    record[f"{name}_s"] += now - start
+    current[1], current[2] = stage, now
+
+
+def stage(name):
+    """Count the rest of the running section build as name ("prep" or "figure").
+
+    A no-op outside a timed build, so builders can call it unconditionally.
+    """
+    _stage_switch(name)
+
+
+def start_trace(session=None, query=None):
+    """Trace for one rerun, configured from the environment and the page's query parameters."""
+    query = query or {}
+    return RerunTrace(
+        session=session,
+        debug=_flag("DASHBOARD_DEBUG") or query.get("debug") in ("1", "true"),
+        export=os.environ.get("DASHBOARD_TRACE"),
+        profile=query.get("profile") if _flag("DASHBOARD_PROFILE") else None,
+    )
+
+
+def export_trace(path, rows):
+    """Append rows to a JSON lines or CSV trace file (safe across sessions of one server)."""
+    with _export_lock:
+        if path.endswith(".csv"):
+            new = not os.path.exists(path) or os.path.getsize(path) == 0
+            with open(path, "a", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=TRACE_FIELDS)
+                if new:
+                    writer.writeheader()
+                writer.writerows(rows)
+        else:
+            with open(path, "a") as f:
+                for row in rows:
+                    f.write(json.dumps(row) + "\n")
+
+
+def read_trace(path):
+    if path.endswith(".csv"):
+        return pd.read_csv(path)
+    return pd.read_json(path, lines=True)
+
+
+def summarize(trace):
+    """Per-section latency percentiles and cache hit ratio from a trace frame."""
+    trace = trace.assign(build_s=trace["prep_s"] + trace["figure_s"],
+                         payload_bytes=pd.to_numeric(trace["payload_bytes"], errors="coerce"))
+    grouped = trace.groupby("section", sort=False)
+    summary = pd.DataFrame({
+        "reruns": grouped.size(),
+        "hit_ratio": grouped["cached"].mean(),
+        "build_p50_ms": grouped["build_s"].median() * 1000,
+        "build_p95_ms": grouped["build_s"].quantile(0.95) * 1000,
+        "render_p50_ms": grouped["render_s"].median() * 1000,
+        "payload_kb": grouped["payload_bytes"].mean() / 1024,
+    })
+    return summary
+
+
+def render_debug_panel(container, trace, cache_stats=None, prefetch_stats=None):
+    """Show the trace of the finished rerun in a Streamlit container (e.g. st.sidebar)."""
+    panel = container.expander("Profiling", expanded=False)
+    rows, df_bytes = trace.frames.get("df", (0, 0))
+    panel.write(f"Rerun {trace.rerun_s * 1000:.0f} ms (load {(trace.load_s or 0) * 1000:.0f} ms), "
+                f"{rows:,} rows, {df_bytes / 2**20:.1f} MB")
+    for name, (frame_rows, frame_bytes) in trace.frames.items():
+        if name != "df":
+            panel.caption(f"{name}: {frame_rows:,} rows, {frame_bytes / 2**20:.1f} MB")
+    table = pd.DataFrame(list(trace.sections.values()))
+    if not table.empty:
+        for col in ["prep_s", "figure_s", "render_s"]:
+            table[col.replace("_s", "_ms")] = (table.pop(col) * 1000).round(1)
+        table["payload_kb"] = (pd.to_numeric(table.pop("payload_bytes"), errors="coerce") / 1024).round(1)
+        panel.dataframe(table, hide_index=True)
+    if cache_stats is not None:
+        hits, misses = sum(cache_stats["hits"].values()), sum(cache_stats["misses"].values())
+        panel.caption(f"Section cache: {cache_stats['entries']} entries, "
+                      f"{cache_stats['nbytes'] / 2**20:.1f} MB, "
+                      f"{hits / max(hits + misses, 1):.0%} hits since start")
+    if prefetch_stats is not None:
+        panel.caption(f"Prefetched: {prefetch_stats['entries']} sections waiting, "
+                      f"{sum(prefetch_stats['hits'].values())} served since start")
+    if trace.profile_output:
+        panel.caption(f"Profile written to {trace.profile_path}")
+        panel.code(trace.profile_output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize DASHBOARD_TRACE files")
+    parser.add_argument("paths", nargs="+")
+    args = parser.parse_args()
+    trace = pd.concat([read_trace(path) for path in args.paths], ignore_index=True)
+    with pd.option_context("display.float_format", "{:.1f}".format, "display.max_columns", None, "display.width", 120):
+        print(summarize(trace))
+    reruns = trace.drop_duplicates("run_id")["rerun_s"] * 1000
+    print(f"\n{len(reruns)} reruns: p50 {reruns.median():.1f} ms, p95 {reruns.quantile(0.95):.1f} ms")
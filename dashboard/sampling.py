@@ -0,0 +1,135 @@
+"""Level-of-detail downsampling for the point-level charts.
+
+Each chart gets a point budget. While the filtered frame fits in the budget the
+exact rows are drawn; above it one of these samplers picks the rows to send:
+
+- stratified: proportional random sample per stratum (e.g. Gender x
+  Motivation_Level), so the category mix of the full data is kept
+- voxel: one random representative per occupied cell of a 3-D grid, so sparse
+  regions and outliers stay visible in the 3D scatter
+- reservoir: uniform (density-preserving) sample of a stream of chunks
+
+All samplers use fixed seeds so the same filter state always draws the same
+points.
+"""
+import numpy as np
+import pandas as pd
+
+SCATTER3D_POINT_BUDGET = 20_000
+PARALLEL_POINT_BUDGET = 10_000
+
+
+def _priorities(n_rows, seed):
+    return np.random.default_rng(seed).random(n_rows)
+
+
+def _allocate(counts, budget):
+    # Proportional allocation with largest remainders (sums to budget exactly)
+    share = counts * (budget / counts.sum())
+    alloc = np.floor(share).astype(np.int64)
+    remainder = budget - alloc.sum()
+    if remainder > 0:
+        alloc[np.argsort(alloc - share, kind="stable")[:remainder]] += 1
+    return np.minimum(alloc, counts)
+
+
+def stratified_rows(df, strata, budget, seed=0):
+    """Sorted positions of a proportional random sample per stratum."""
+    n_rows = len(df)
+    if n_rows <= budget:
+        return np.arange(n_rows)
+
+    codes = df.groupby(list(strata), observed=True, dropna=False, sort=False).ngroup().to_numpy()
+    counts = np.bincount(codes)
+    quota = _allocate(counts, budget)
+
+    # Sort by (stratum, random priority); keep the first quota[s] rows of each stratum
+    order = np.lexsort((_priorities(n_rows, seed), codes))
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    rank = np.arange(n_rows) - starts[codes[order]]
+    keep = order[rank < quota[codes[order]]]
+    return np.sort(keep)
+
+
+def voxel_rows(df, columns, budget, seed=0):
+    """Sorted positions of one random row per occupied voxel of a grid over columns.
+
+    The grid has budget ** (1 / len(columns)) cells per axis, so the number of
+    occupied voxels (and of returned rows) never exceeds the budget.
+    """
+    n_rows = len(df)
+    if n_rows <= budget:
+        return np.arange(n_rows)
+
+    bins = max(1, int(budget ** (1.0 / len(columns))))
+    voxel = np.zeros(n_rows, dtype=np.int64)
+    for col in columns:
+        values = df[col].to_numpy(dtype=float)
+        low, high = np.nanmin(values), np.nanmax(values)
+        span = high - low if high > low else 1.0
+        cell = np.clip(((values - low) / span * bins).astype(np.int64), 0, bins - 1)
+        voxel = voxel * bins + cell
+
+    order = np.lexsort((_priorities(n_rows, seed), voxel))
+    first = np.ones(n_rows, dtype=bool)
+    first[1:] = voxel[order][1:] != voxel[order][:-1]
+    return np.sort(order[first])
+
+
+class ReservoirSampler:
+    """Uniform fixed-size sample of a stream of DataFrame chunks (Algorithm R).
+
+    Every row seen so far has the same probability of being in the sample, so
+    the sample keeps the density of the full stream.
+    """
+
+    def __init__(self, size, seed=0):
+        self.size = size
+        self.seen = 0
+        self.sample = None
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, chunk):
+        chunk = chunk.reset_index(drop=True)
+        take = 0
+        if self.sample is None or len(self.sample) < self.size:
+            take = min(self.size - (0 if self.sample is None else len(self.sample)), len(chunk))
+            head = chunk.iloc[:take]
+            self.sample = head if self.sample is None else pd.concat([self.sample, head], ignore_index=True)
+            self.seen += take
+
+        rest = len(chunk) - take
+        if rest > 0:
+            # Row t (1-based, over the whole stream) replaces a random slot with probability size / t
+            t = self.seen + 1 + np.arange(rest)
+            slots = (self._rng.random(rest) * t).astype(np.int64)
+            accepted = np.flatnonzero(slots < self.size)
+            if len(accepted):
+                # Later rows overwrite earlier ones in the same slot, as in the sequential algorithm
+                slot_ids = slots[accepted]
+                last = len(slot_ids) - 1 - np.unique(slot_ids[::-1], return_index=True)[1]
+                incoming = chunk.iloc[take + accepted[last]]
+                layout = np.arange(len(self.sample))
+                layout[slot_ids[last]] = len(self.sample) + np.arange(len(last))
+                self.sample = pd.concat([self.sample, incoming], ignore_index=True).take(layout)
+                self.sample = self.sample.reset_index(drop=True)
+            self.seen += rest
+        return self
+
+    def rows(self):
+        return self.sample if self.sample is not None else pd.DataFrame()
+
+
+def downsample(df, budget, method="stratified", strata=None, columns=None, seed=0):
+    """Rows of df to draw under the point budget (exact rows when they fit)."""
+    if len(df) <= budget:
+        return df
+    if method == "stratified":
+        rows = stratified_rows(df, strata, budget, seed)
+    elif method == "voxel":
+        rows = voxel_rows(df, columns, budget, seed)
+    elif method == "random":
+        rows = np.sort(np.random.default_rng(seed).choice(len(df), size=budget, replace=False))
+    else:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    return df.take(rows)
@@ -0,0 +1,126 @@
+"""Sankey link builder.
+
+Counts every (stage i, stage i+1) pair in one pass with ``np.bincount`` on the
+stage codes instead of one boolean scan per pair, and works for any number of
+stages (e.g. Study -> Motivation -> Teacher_Quality -> Score).
+"""
+import numpy as np
+import pandas as pd
+
+
+def stage_labels(series, labels=None):
+    # Explicit labels win; otherwise the sorted values present in the data
+    if labels is not None:
+        return list(labels)
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        present = np.bincount(codes[codes >= 0], minlength=len(series.cat.categories)) > 0
+        return sorted(series.cat.categories[present])
+    return sorted(series.dropna().unique())
+
+
+def stage_codes(series, labels):
+    # Position of every row's value in labels (-1 = missing / not a label)
+    return pd.Categorical(series, categories=labels).codes.astype(np.int64)
+
+
+def build_sankey_links(df, stages, highlight=None):
+    """Nodes and links for a multi-stage Sankey diagram.
+
+    stages: list of (column, hover name, labels or None) tuples, in flow order.
+    highlight: optional {column: allowed values}; a link is highlighted unless
+    one of its two endpoints is in such a column and not in the allowed values.
+
+    Returns a dict with the node labels and the source/target/value/hover/
+    highlight arrays of the links. Node indices are offset per stage, so equal
+    labels in different stages ("Low" motivation vs "Low" score) stay
+    separate nodes.
+    """
+    stage_label_lists, codes = [], []
+    for col, _, labels in stages:
+        labels = stage_labels(df[col], labels)
+        stage_label_lists.append(labels)
+        codes.append(stage_codes(df[col], labels))
+
+    pair_counts = []
+    for i in range(len(stages) - 1):
+        a, b = codes[i], codes[i + 1]
+        n_a, n_b = len(stage_label_lists[i]), len(stage_label_lists[i + 1])
+        valid = (a >= 0) & (b >= 0)
+        counts = np.bincount(a[valid] * n_b + b[valid], minlength=n_a * n_b)
+        pair_counts.append(counts.reshape(n_a, n_b))
+    return sankey_from_counts(stages, stage_label_lists, pair_counts, highlight)
+
+
+def sankey_from_counts(stages, stage_label_lists, pair_counts, highlight=None):
+    """Nodes and links from precomputed (n_labels_i x n_labels_i+1) count tables.
+
+    Lets the links come from any aggregate source (raw rows above, or a
+    rolled-up dashboard.cube) with the same output as build_sankey_links.
+    """
+    highlight = highlight or {}
+
+    all_labels, offsets = [], []
+    for labels in stage_label_lists:
+        offsets.append(len(all_labels))
+        all_labels.extend(labels)
+    source, target, value, hover, highlighted = [], [], [], [], []
+
+    for i in range(len(stages) - 1):
+        counts = np.asarray(pair_counts[i], dtype=np.int64)
+        n_b = counts.shape[1]
+        flat = counts.ravel()
+        pairs = np.flatnonzero(flat)
+        src, dst = pairs // n_b, pairs % n_b
+
+        col_a, name_a, _ = stages[i]
+        col_b, name_b, _ = stages[i + 1]
+        labels_a, labels_b = stage_label_lists[i], stage_label_lists[i + 1]
+
+        keep_a = np.array([col_a not in highlight or lab in highlight[col_a] for lab in labels_a], dtype=bool)
+        keep_b = np.array([col_b not in highlight or lab in highlight[col_b] for lab in labels_b], dtype=bool)
+
+        source.append(src + offsets[i])
+        target.append(dst + offsets[i + 1])
+        value.append(flat[pairs])
+        highlighted.append(keep_a[src] & keep_b[dst])
+        hover.extend(
+            f"{name_a}: {labels_a[s]}<br>{name_b}: {labels_b[d]}<br>Count: {c}"
+            for s, d, c in zip(src, dst, flat[pairs])
+        )
+
+    def _concat(parts, dtype):
+        return np.concatenate(parts) if parts else np.array([], dtype=dtype)
+
+    return {
+        "labels": all_labels,
+        "source": _concat(source, np.int64),
+        "target": _concat(target, np.int64),
+        "value": _concat(value, np.int64),
+        "hover": hover,
+        "highlight": _concat(highlighted, bool),
+    }
+
+
+def sankey_from_cube(cube, stages, where=None, highlight=None):
+    """Same output as build_sankey_links, answered from a dashboard.cube roll-up.
+
+    where: {dimension: allowed values} filters applied before counting (the
+    equivalent of filtering the rows first).
+    """
+    where = where or {}
+    stage_label_lists = []
+    for col, _, labels in stages:
+        if labels is None:
+            totals, (present,) = cube.table([col], where)
+            labels = sorted(label for label, n in zip(present, totals) if n > 0)
+        stage_label_lists.append(list(labels))
+
+    pair_counts = []
+    for i in range(len(stages) - 1):
+        col_a, col_b = stages[i][0], stages[i + 1][0]
+        counts, (labels_a, labels_b) = cube.table([col_a, col_b], where)
+        table = pd.DataFrame(counts, index=labels_a, columns=labels_b)
+        table = table.reindex(index=stage_label_lists[i], columns=stage_label_lists[i + 1], fill_value=0)
+        pair_counts.append(table.to_numpy())
+    return sankey_from_counts(stages, stage_label_lists, pair_counts, highlight)
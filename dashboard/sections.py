@@ -0,0 +1,576 @@
+"""The dashboard's chart sections as plain functions, importable without Streamlit.
+
+``open_dashboard(path)`` loads the dataset (streamed in chunks for very large
+files, see dashboard/streaming.py) and builds the per-dataset structures the
+charts read: filter bitsets, the aggregation cube and the correlation
+statistics. Every chart then has
+
+* a data function (``treemap_data``, ``sankey_data``, ``mekko_data``, ...) that
+  turns the dataset and the section's widget values into what the chart draws,
+* a ``build_*`` function that wraps that into a Plotly figure (and a caption
+  when the points are sampled).
+
+Both take the widget values as arguments and read nothing else, so app.py is
+only widgets and rendering, and the same code runs in batch jobs, warm-up
+scripts or worker processes:
+
+    data = open_dashboard("data/student_performance.csv")
+    fig = build_sankey(data, ["Public"], ["High"], ["Low", "Medium", "High"])
+"""
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from dashboard.boxplot import BOX_POINTS_THRESHOLD, aggregated_box_figure, get_box_stats, sketch_box_stats
+from dashboard.correlation import get_correlation_engine, heatmap_axes, highlight_trace
+from dashboard.cube import get_cube
+from dashboard.filters import SCORE_LEVEL_LABELS, STUDY_HOURS_LABELS, get_filter_index, get_range_index
+from dashboard.loader import DATA_PATH, load_dataset
+from dashboard.marimekko import mekko_from_counts
+from dashboard.memo import get_section
+from dashboard.outliers import IQR_COLUMNS, get_iqr_bounds, trim_outliers
+from dashboard.profiling import stage
+from dashboard.sampling import PARALLEL_POINT_BUDGET, SCATTER3D_POINT_BUDGET, downsample
+from dashboard.sankey import sankey_from_cube
+from dashboard.streaming import load_summary, streaming_enabled
+from dashboard.transport import compact_figure
+from dashboard.violin import split_kde, split_violin_figure
+
+TEACHER_QUALITY_ORDER = ["Low", "Medium", "High"]
+SCATTER3D_COLUMNS = ["Hours_Studied", "Previous_Scores", "Exam_Score"]
+SANKEY_STAGES = [
+    ("Study_Hours_Group", "Study", STUDY_HOURS_LABELS),
+    ("Motivation_Level", "Motivation", None),
+    ("Score_Level", "Score", SCORE_LEVEL_LABELS),
+]
+VIOLIN_SIDES = ["Female", "Male"]
+SESSION_ORDER = ["0", "1", "2", "3", "4+"]
+
+
+class DashboardData:
+    """The loaded dataset and the per-dataset structures built from it."""
+
+    def __init__(self, df, path=DATA_PATH, summary=None):
+        self.df = df
+        self.path = path
+        # StreamSummary in streaming mode (df is then its row sample)
+        self.summary = summary
+        # Per-category bitsets for the multiselect filters (built once per dataset)
+        self.filter_index = get_filter_index(df)
+        # Count/sum/sum-of-squares cube over the categorical chart dimensions (built once per dataset)
+        self.cube = summary.cube if summary is not None else get_cube(df)
+        # Per-School_Type correlation sufficient statistics
+        self.correlation = summary.correlation if summary is not None else get_correlation_engine(df)
+
+        # Motivation_Level kategorik ise numeric yap
+        if df["Motivation_Level"].dtype.name == "category" or df["Motivation_Level"].dtype == object:
+            self.motivation_col = "Motivation_Level_Num"
+        else:
+            self.motivation_col = "Motivation_Level"
+        self.parallel_dimensions = [
+            "Hours_Studied", "Attendance", "Sleep_Hours", "Previous_Scores", self.motivation_col, "Exam_Score"
+        ]
+
+    @property
+    def streaming(self):
+        return self.summary is not None
+
+    def filtered(self, school_option):
+        """Rows of the selected School_Types (memoized per selection)."""
+        return get_section(self.df, "filtered", {"school_option": school_option},
+                           lambda: self.filter_index.select({"School_Type": school_option}))
+
+    def parallel_index(self, school_option, remove_outliers):
+        # Sorted-column index of the prepared frame; built once per (school filter, outlier toggle)
+        # and reused while the sliders are dragged
+        return get_range_index(
+            self.df,
+            ("parallel", frozenset(school_option), remove_outliers),
+            lambda: parallel_frame(self, school_option, remove_outliers),
+            ["Hours_Studied", "Attendance", "Sleep_Hours", self.motivation_col, "Exam_Score"]
+        )
+
+    def scatter3d_index(self):
+        # Prepare dataframe by removing rows with missing values (indexed once per dataset)
+        return get_range_index(
+            self.df,
+            ("scatter3d",),
+            lambda: self.df.dropna(subset=SCATTER3D_COLUMNS),
+            SCATTER3D_COLUMNS
+        )
+
+
+def open_dashboard(path=DATA_PATH):
+    """Load path (typed + cached, only re-parsed when the file changes).
+
+    Exports too large for memory are streamed once in chunks instead: the
+    aggregates come from single-pass statistics and df is a bounded row sample.
+    """
+    if streaming_enabled(path):
+        summary = load_summary(path)
+        return DashboardData(summary.sample, path, summary)
+    return DashboardData(load_dataset(path), path)
+
+
+# ----------------------------- BOX PLOT: TEACHER QUALITY VS ATTENDANCE ---------------------------------
+def box_data(data, school_option):
+    """(filtered rows, box groups); groups is None when every point can be drawn."""
+    filtered_df = data.filtered(school_option)
+    if not data.streaming and len(filtered_df) <= BOX_POINTS_THRESHOLD:
+        return filtered_df, None
+    # Too many rows to ship every point: quartiles/whiskers/outliers are computed
+    # server-side (cached per school filter) and only a sample of points is drawn
+    if not data.streaming:
+        return filtered_df, get_box_stats(
+            data.df,
+            ("box", frozenset(school_option)),
+            filtered_df, "Teacher_Quality", "Attendance", TEACHER_QUALITY_ORDER
+        )
+    # Streaming mode: quartiles from the full-file sketches, points from the sample
+    return filtered_df, sketch_box_stats(
+        {
+            level: data.summary.sketch("Attendance", {"School_Type": school_option, "Teacher_Quality": [level]})
+            for level in TEACHER_QUALITY_ORDER
+        },
+        filtered_df, "Teacher_Quality", "Attendance"
+    )
+
+
+def build_box(data, school_option):
+    # Make the Box Plot (X: Teacher Quality, Y: Attendance Rate)
+    filtered_df, box_groups = box_data(data, school_option)
+    stage("figure")
+    if box_groups is None:
+        fig_box = px.box(
+            filtered_df,
+            x="Teacher_Quality", # X-axis is the teacher's quality level
+            y="Attendance", # Y-axis is the attendance score (e.g., percentage)
+            color="Teacher_Quality", # Color the boxes based on Teacher Quality
+            category_orders={'Teacher_Quality': TEACHER_QUALITY_ORDER}, # Ensure categories are ordered correctly
+            points="all", # Show all the tiny data points
+            hover_data=["Hours_Studied", "Exam_Score", "Parental_Involvement"] # Show extra info when hovering
+        )
+    else:
+        fig_box = aggregated_box_figure(
+            filtered_df,
+            box_groups,
+            x="Teacher_Quality",
+            y="Attendance",
+            hover_data=["Hours_Studied", "Exam_Score", "Parental_Involvement"],
+            total_rows=sum(group["count"] for group in box_groups) if data.streaming else None
+        )
+
+    # Fix up the Graph Looks
+    fig_box.update_layout(
+        title="Student Attendance Rate Distribution Grouped by Teacher Quality",
+        xaxis_title="Teacher Quality Level",
+        yaxis_title="Attendance Rate (%)",
+        boxmode="group" # Ensures the boxes are displayed as a group
+    )
+    return compact_figure(fig_box)
+
+
+# ----------------------------- TREEMAP ---------------------------------
+def treemap_data(data):
+    # Mean Exam_Score per group, rolled up from the shared aggregation cube
+    treemap_df = data.cube.rollup(["School_Type", "Parental_Education_Level", "Gender"])
+    return treemap_df[["School_Type", "Parental_Education_Level", "Gender", "mean"]].rename(
+        columns={"mean": "Exam_Score"}
+    )
+
+
+def build_treemap(data):
+    treemap_df = treemap_data(data)
+
+    stage("figure")
+    fig2 = px.treemap(
+        treemap_df,
+        path=["School_Type", "Parental_Education_Level", "Gender"],
+        values="Exam_Score",
+        color="Exam_Score",
+        color_continuous_scale="Blues",
+        hover_data=["Exam_Score"]
+    )
+
+    fig2.update_layout(margin=dict(t=50, l=25, r=25, b=25))
+    return compact_figure(fig2)
+
+
+# ----------------------------- PARALLEL COORDINATES ---------------------------------
+def parallel_frame(data, school_option, drop_outliers):
+    # Eğer ON ise numeric kolonlarda outlier kes: the IQR fences of all columns
+    # come from one quantile pass (cached per school filter; from the full-file
+    # sketches in streaming mode) and are applied as one combined mask
+    filtered_df = data.filtered(school_option)
+    if drop_outliers:
+        bounds = get_iqr_bounds(
+            data.df,
+            {"School_Type": school_option},
+            filtered_df,
+            IQR_COLUMNS,
+            sketches=data.summary.sketches if data.streaming else None
+        )
+        parallel_df = trim_outliers(filtered_df, bounds=bounds)
+    else:
+        parallel_df = filtered_df.copy()
+
+    if data.motivation_col == "Motivation_Level_Num":
+        # assign, not item assignment: trim_outliers returns a slice of filtered_df
+        parallel_df = parallel_df.assign(
+            Motivation_Level_Num=parallel_df["Motivation_Level"].astype("category").cat.codes
+        )
+    return parallel_df
+
+
+def parallel_data(data, school_option, remove_outliers, hours_range, attendance_range, sleep_range,
+                  motivation_range):
+    """(rows to draw, Exam_Score midpoint, caption or None)."""
+    parallel_index = data.parallel_index(school_option, remove_outliers)
+    # Apply filters (searchsorted on the sorted columns instead of full-column masks)
+    parallel_df_filtered = parallel_index.select({
+        "Hours_Studied": hours_range,
+        "Attendance": attendance_range,
+        "Sleep_Hours": sleep_range,
+        data.motivation_col: motivation_range,
+    })
+
+    # Above the point budget draw a sample that keeps the Gender x Motivation mix;
+    # narrow the sliders enough and the exact rows come back
+    parallel_df_plot = downsample(
+        parallel_df_filtered,
+        PARALLEL_POINT_BUDGET,
+        method="stratified",
+        strata=["Gender", "Motivation_Level"]
+    )
+    parallel_caption = None
+    if len(parallel_df_plot) < len(parallel_df_filtered):
+        parallel_caption = f"Showing a stratified sample of {len(parallel_df_plot):,} of {len(parallel_df_filtered):,} students."
+
+    midpoint = (parallel_df_filtered["Exam_Score"].mean()
+                if not parallel_df_filtered.empty
+                else parallel_index.mean("Exam_Score"))
+    return parallel_df_plot, midpoint, parallel_caption
+
+
+def build_parallel(data, school_option, remove_outliers, hours_range, attendance_range, sleep_range,
+                   motivation_range):
+    parallel_df_plot, midpoint, parallel_caption = parallel_data(
+        data, school_option, remove_outliers, hours_range, attendance_range, sleep_range, motivation_range
+    )
+
+    # DRAW PARALLEL COORDINATES
+    stage("figure")
+    fig3 = px.parallel_coordinates(
+        parallel_df_plot,
+        dimensions=data.parallel_dimensions,
+        color="Exam_Score",
+        color_continuous_scale=px.colors.diverging.Tealrose,
+        color_continuous_midpoint=midpoint
+    )
+    return compact_figure(fig3), parallel_caption
+
+
+# ----------------------------- 3D SCATTER PLOT ---------------------------------
+def scatter3d_data(data, hours_range, prev_range, exam_range, color_option):
+    """(rows to draw, color column, color map or None, caption or None)."""
+    # Apply filters
+    df_scatter3d_filtered = data.scatter3d_index().select({
+        "Hours_Studied": hours_range,
+        "Previous_Scores": prev_range,
+        "Exam_Score": exam_range,
+    })
+
+    # Categorical renkler için özel skalalar
+    color_map = None
+    if color_option == "Gender":
+        color_map = {"Male": "blue", "Female": "pink"}
+    elif color_option == "Motivation_Level":
+        color_map = {"Low": "red", "Medium": "yellow", "High": "green"}
+    # (numeric color_option: default scale)
+
+    # Level of detail: one point per occupied voxel for the numeric color scale,
+    # a stratified sample (same category mix) when coloring by a category
+    if color_map is None:
+        df_scatter3d_plot = downsample(
+            df_scatter3d_filtered,
+            SCATTER3D_POINT_BUDGET,
+            method="voxel",
+            columns=SCATTER3D_COLUMNS
+        )
+    else:
+        df_scatter3d_plot = downsample(
+            df_scatter3d_filtered,
+            SCATTER3D_POINT_BUDGET,
+            method="stratified",
+            strata=[color_option]
+        )
+    scatter3d_caption = None
+    if len(df_scatter3d_plot) < len(df_scatter3d_filtered):
+        scatter3d_caption = f"Showing {len(df_scatter3d_plot):,} of {len(df_scatter3d_filtered):,} students."
+    return df_scatter3d_plot, color_option, color_map, scatter3d_caption
+
+
+def build_scatter3d(data, hours_range, prev_range, exam_range, color_option):
+    df_scatter3d_plot, color_col, color_map, scatter3d_caption = scatter3d_data(
+        data, hours_range, prev_range, exam_range, color_option
+    )
+
+    # Create an interactive 3D scatter plot using Plotly
+    stage("figure")
+    fig_3d = px.scatter_3d(
+        df_scatter3d_plot,
+        x="Hours_Studied",
+        y="Previous_Scores",
+        z="Exam_Score",
+        color=color_col,
+        size="Hours_Studied",
+        opacity=0.75,
+        hover_data=["Gender", "Motivation_Level"],
+        color_discrete_map=color_map  # categorical için uygulanır, numeric ise ignore edilir
+    )
+
+    fig_3d.update_layout(
+        title="3D Scatter Plot of Student Performance",
+        scene=dict(
+            xaxis_title="Hours Studied",
+            yaxis_title="Previous Scores",
+            zaxis_title="Exam Score",
+        )
+    )
+    return compact_figure(fig_3d), scatter3d_caption
+
+
+# -----------------------------  CORRELATION HEATMAP ---------------------------------
+def correlation_data(data, school_option, selected_cols):
+    # Assembled from cached per-School_Type sums; the rows are not rescanned
+    return data.correlation.corr(selected_cols, partitions=school_option)
+
+
+def build_heatmap(data, school_option, selected_cols, threshold):
+    corr = correlation_data(data, school_option, selected_cols)
+
+    stage("figure")
+    fig_heatmap = go.Figure()
+
+    # Use a diverging color scale: red for negative, blue for positive
+    # 'RdBu' starts with red at -1, blue at +1
+    # Cells at positions 0..k-1 (labeled by heatmap_axes), so the highlight
+    # outlines can be drawn in data coordinates
+    positions = np.arange(len(corr.columns))
+    pair_labels = corr.columns.to_numpy(dtype=object)[None, :] + " & " + corr.index.to_numpy(dtype=object)[:, None]
+    fig_heatmap.add_trace(go.Heatmap(
+        z=corr.values,
+        x=positions,
+        y=positions,
+        text=pair_labels,
+        colorscale="RdBu",
+        zmin=-1, zmax=1,
+        hovertemplate="<b>%{text}</b><br>Correlation: %{z:.3f}<extra></extra>"
+    ))
+
+    # All cells above the threshold in one overlay trace (vectorized mask)
+    fig_heatmap.add_trace(highlight_trace(corr, threshold))
+
+    heatmap_xaxis, heatmap_yaxis = heatmap_axes(corr)
+    fig_heatmap.update_layout(
+        title=f"Correlation Heatmap (Highlight ≥ {threshold})",
+        width=800, height=700,
+        xaxis=heatmap_xaxis,
+        yaxis=heatmap_yaxis
+    )
+    return compact_figure(fig_heatmap)
+
+
+# ----------------------------- SANKEY DIAGRAM ---------------------------------
+def sankey_data(data, school_option, motivation_filter, score_filter):
+    # Link counts rolled up from the aggregation cube (filters applied on the cube axes)
+    return sankey_from_cube(
+        data.cube,
+        stages=SANKEY_STAGES,
+        where={
+            "School_Type": school_option,
+            "Motivation_Level": motivation_filter,
+            "Score_Level": score_filter,
+        },
+        highlight={"Motivation_Level": motivation_filter}
+    )
+
+
+def build_sankey(data, school_option, motivation_filter, score_filter):
+    sankey = sankey_data(data, school_option, motivation_filter, score_filter)
+
+    stage("figure")
+    link_colors = np.where(sankey["highlight"], "rgba(0,100,200,0.8)", "rgba(200,200,200,0.2)")
+
+    fig_sankey = go.Figure(data=[go.Sankey(
+        node=dict(
+            label=sankey["labels"],
+            pad=25,
+            thickness=25,
+            color="rgba(0,0,0,0.7)"
+        ),
+        link=dict(
+            source=sankey["source"],
+            target=sankey["target"],
+            value=sankey["value"],
+            color=link_colors,
+            customdata=sankey["hover"],
+            hovertemplate="%{customdata}<extra></extra>"
+        )
+    )])
+
+    fig_sankey.update_layout(
+        title="Advanced Sankey Diagram: Study → Motivation → Score",
+        font=dict(size=12)
+    )
+    return compact_figure(fig_sankey)
+
+
+# ----------------------------- SPLIT VIOLIN PLOT ---------------------------------
+def violin_data(data, aggregate=None):
+    """(Motivation levels, KDE curves per (level, gender)).
+
+    KDE curves computed server-side on a fixed grid (one split of the rows by
+    Motivation_Level x Gender); only the curve points are sent. aggregate is
+    SectionPipeline.aggregate, which runs the KDE in a worker process with the
+    process executor.
+    """
+    mot_levels = list(data.df["Motivation_Level"].unique())
+    args = ("Motivation_Level", "Gender", "Exam_Score", mot_levels, VIOLIN_SIDES)
+    if aggregate is None:
+        return mot_levels, split_kde(data.df, *args)
+    return mot_levels, aggregate(split_kde, *args).result()
+
+
+def build_violin(data, aggregate=None):
+    mot_levels, violin_curves = violin_data(data, aggregate)
+
+    # Female → left side, Male → right side
+    stage("figure")
+    fig = split_violin_figure(
+        violin_curves,
+        mot_levels,
+        VIOLIN_SIDES,
+        colors={"Female": "pink", "Male": "blue"},
+        width=0.9,
+        opacity=0.6
+    )
+
+    fig.update_layout(
+        title="Split Violin: Exam Score vs Motivation Level (Gender Comparison)",
+        xaxis_title="Motivation Level",
+        yaxis_title="Exam Score",
+        showlegend=True
+    )
+    return compact_figure(fig)
+
+
+# ----------------------------- PIE CHART ---------------------------------
+def pie_data(data, selected_genders):
+    # Peer_Influence counts for the selected genders, from the aggregation cube
+    peer_counts = data.cube.rollup(["Peer_Influence"], where={"Gender": selected_genders})
+    peer_counts = peer_counts.sort_values("count", ascending=False, kind="stable")[["Peer_Influence", "count"]]
+    peer_counts.columns = ["Peer_Influence", "Count"]
+    return peer_counts
+
+
+def build_pie(data, selected_genders):
+    peer_counts = pie_data(data, selected_genders)
+
+    # color mapping
+    stage("figure")
+    color_map = {
+        "Negative": "red",
+        "Neutral": "yellow",
+        "Positive": "green"
+    }
+
+    fig_pie = px.pie(
+        peer_counts,
+        names="Peer_Influence",
+        values="Count",
+        title="Peer Influence Categories (%)",
+        color="Peer_Influence",
+        color_discrete_map=color_map
+    )
+    return compact_figure(fig_pie)
+
+
+# ----------------------------- MARIMEKKO CHART ---------------------------------
+def mekko_data(data):
+    # Distance x Tutoring_Group counts rolled up from the aggregation cube
+    #   - NaN Distance_from_Home rows are dropped (as requested: "I don't want unknown to show")
+    #   - Tutoring_Sessions is clipped to '0'..'3' / '4+' when the cube is built
+    #   - X shares and conditional (row) percentages by broadcasting
+    mekko_counts, (mekko_rows, mekko_cols) = data.cube.table(["Distance_from_Home", "Tutoring_Group"])
+    return mekko_from_counts(pd.DataFrame(mekko_counts, index=mekko_rows, columns=mekko_cols), SESSION_ORDER)
+
+
+def build_mekko(data):
+    # Color map for the sessions
+    color_map_sessions = {
+        '0': '#800080', # Purple (No Sessions)
+        '1': '#f04e38', # Orange-Red
+        '2': '#ffc107', # Gold/Yellow
+        '3': '#17a2b8', # Cyan
+        '4+': '#28a745', # Green (High Sessions)
+    }
+
+    mekko = mekko_data(data)
+
+    distance_categories = mekko["categories"]
+    distance_proportions = mekko["shares"]
+    x_centers = mekko["x_centers"]
+    conditional_percentages = mekko["conditional"]
+
+    # Create custom data array for tooltips (category name, share %)
+    stage("figure")
+    customdata = np.stack((distance_categories, mekko["share_percent"]), axis=-1)
+
+    # Iterate through session types to create stack layers
+    fig_mekko = go.Figure()
+    bottom_stack = np.zeros(len(distance_categories))
+
+    for session_category in SESSION_ORDER:
+        heights = conditional_percentages[session_category].values
+
+        # Create the proportional bar trace
+        fig_mekko.add_trace(go.Bar(
+            x=x_centers,
+            y=heights,
+            width=distance_proportions, # This controls the proportional width
+            base=bottom_stack, # Stack on top of the previous category
+            name=session_category,
+            marker_color=color_map_sessions[session_category],
+            text=heights,
+            texttemplate='%{text:.1f}%',
+            textposition='inside',
+            hoverinfo='name+y',
+            # Reference customdata using customdata[0] (Category Name) and customdata[1] (Share %)
+            hovertemplate=f"Distance: %{{customdata[0]}}<br>Share: %{{customdata[1]:.1f}}%<br>Sessions: {session_category}<br>Conditional %: %{{y:.1f}}%<extra></extra>",
+            customdata=customdata, # Use the correctly shaped customdata array
+        ))
+        # Update the bottom_stack for the next layer
+        bottom_stack += heights
+
+    # Format the Mekko Chart
+    # Set X-axis to display categories centered in their proportional width
+    fig_mekko.update_layout(
+        barmode='stack',
+        title='Marimekko Chart: Extra Tutoring Sessions Distribution by Distance from Home',
+        xaxis=dict(
+            tickvals=x_centers,
+            ticktext=[f"{cat} ({share:.1f}%)" for cat, share in zip(distance_categories, mekko["share_percent"])],
+            showgrid=False,
+            title='Distance from Home Category (Bar Width is Total Share %)'
+        ),
+        yaxis=dict(
+            range=[0, 100],
+            title='Extra Tutoring Sessions (Y-Axis, Conditional %)',
+            ticksuffix="%"
+        ),
+        plot_bgcolor='white',
+        legend_title_text='Sessions Count',
+    )
+    return compact_figure(fig_mekko)
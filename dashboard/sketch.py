@@ -0,0 +1,149 @@
+"""Mergeable quantile sketch for single-pass statistics.
+
+The sketch keeps distinct values with their counts, which is exact (and small)
+for the dashboard's integer score/hour columns, and answers quantiles with the
+same linear interpolation as ``np.quantile`` / ``Series.quantile``. When a
+column has more than ``max_centroids`` distinct values, neighbouring values are
+merged into weighted centroids of roughly equal weight, so memory stays
+bounded and quantiles become approximate (rank error about 1 / max_centroids).
+Sketches of separate chunks or partitions merge into the sketch of their union.
+"""
+import numpy as np
+import pandas as pd
+
+SKETCH_MAX_CENTROIDS = 2048
+
+
+class QuantileSketch:
+    def __init__(self, max_centroids=SKETCH_MAX_CENTROIDS):
+        self.max_centroids = max_centroids
+        self.values = np.empty(0)
+        self.weights = np.empty(0)
+        self.total = 0.0
+        self.min = np.nan
+        self.max = np.nan
+        self.exact = True
+
+    @property
+    def count(self):
+        return int(self.weights.sum())
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else np.nan
+
+    def add(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        distinct, counts = np.unique(values, return_counts=True)
+        self.total += float(values.sum())
+        return self._absorb(distinct, counts.astype(float), distinct[0], distinct[-1])
+
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        self.total += other.total
+        self.exact = self.exact and other.exact
+        return self._absorb(other.values, other.weights, other.min, other.max)
+
+    def _absorb(self, values, weights, low, high):
+        values, inverse = np.unique(np.concatenate([self.values, values]), return_inverse=True)
+        self.weights = np.bincount(inverse, weights=np.concatenate([self.weights, weights]))
+        self.values = values
+        self.min = low if np.isnan(self.min) else min(self.min, low)
+        self.max = high if np.isnan(self.max) else max(self.max, high)
+        if len(self.values) > self.max_centroids:
+            self._compress()
+        return self
+
+    def _compress(self):
+        # Equal-weight bins over the cumulative weight; each bin becomes its weighted mean
+        target = self.max_centroids // 2
+        cum = np.cumsum(self.weights)
+        bins = np.minimum(((cum - self.weights / 2) / cum[-1] * target).astype(np.int64), target - 1)
+        weights = np.bincount(bins, weights=self.weights, minlength=target)
+        sums = np.bincount(bins, weights=self.values * self.weights, minlength=target)
+        used = weights > 0
+        self.values = sums[used] / weights[used]
+        self.weights = weights[used]
+        self.exact = False
+
+    def quantile(self, q):
+        """Quantile(s) with linear interpolation between order statistics."""
+        q = np.asarray(q, dtype=float)
+        if self.count == 0:
+            return np.full(q.shape, np.nan)
+        position = (self.count - 1) * q
+        below = np.floor(position)
+        cum = np.cumsum(self.weights)
+        # The k-th smallest value (0-based) sits in the first centroid whose cumulative weight exceeds k
+        lo = self.values[np.searchsorted(cum, below, side="right")]
+        hi = self.values[np.minimum(np.searchsorted(cum, below + 1, side="right"), len(cum) - 1)]
+        result = lo + (position - below) * (hi - lo)
+        # Extremes are tracked exactly even when the centroids are merged
+        result = np.where(q <= 0, self.min, np.where(q >= 1, self.max, result))
+        return np.clip(result, self.min, self.max)
+
+    def within(self, lower, upper):
+        """Smallest and largest value in [lower, upper] (NaN if there is none)."""
+        inside = self.values[(self.values >= lower) & (self.values <= upper)]
+        if len(inside) == 0:
+            return np.nan, np.nan
+        low = self.min if self.min >= lower else inside[0]
+        high = self.max if self.max <= upper else inside[-1]
+        return low, high
+
+
+class PartitionedSketches:
+    """One sketch per numeric column and partition cell (e.g. School_Type x Teacher_Quality).
+
+    Any filter on the partition columns is answered by merging the matching
+    cells, without touching the rows again.
+    """
+
+    def __init__(self, columns, partitions, max_centroids=SKETCH_MAX_CENTROIDS):
+        self.columns = list(columns)
+        self.partitions = list(partitions)
+        self.max_centroids = max_centroids
+        self.cells = {}  # (column, partition values) -> QuantileSketch
+
+    def update(self, df):
+        # Split the rows once by partition cell, then sketch each column
+        cats = [pd.Categorical(df[col]) for col in self.partitions]
+        codes = [np.where(cat.codes < 0, len(cat.categories), cat.codes) for cat in cats]
+        shape = tuple(len(cat.categories) + 1 for cat in cats)
+        cell = np.ravel_multi_index(codes, shape) if codes else np.zeros(len(df), dtype=np.int64)
+        order = np.argsort(cell, kind="stable")
+        cells, starts = np.unique(cell[order], return_index=True)
+        ends = np.append(starts[1:], len(order))
+
+        columns = [col for col in self.columns if col in df.columns]
+        values = {col: df[col].to_numpy(dtype=float) for col in columns}
+        for flat, start, end in zip(cells, starts, ends):
+            index = np.unravel_index(flat, shape)
+            # Missing partition values are kept under None (never match a filter, like isin)
+            key = tuple(
+                cat.categories[i] if i < len(cat.categories) else None
+                for cat, i in zip(cats, index)
+            )
+            rows = order[start:end]
+            for col in columns:
+                sketch = self.cells.setdefault((col, key), QuantileSketch(self.max_centroids))
+                sketch.add(values[col][rows])
+        return self
+
+    def sketch(self, column, where=None):
+        """Sketch of column over the rows whose partition values are in where."""
+        where = where or {}
+        merged = QuantileSketch(self.max_centroids)
+        for (col, key), sketch in self.cells.items():
+            if col != column:
+                continue
+            if all(
+                value in where[part] for part, value in zip(self.partitions, key)
+                if where.get(part) is not None
+            ):
+                merged.merge(sketch)
+        return merged
@@ -0,0 +1,150 @@
+"""Pre-rendered default-state figures.
+
+Most visits start with the default widget values (every school type and
+gender, the default heatmap columns and threshold), and the charts that only
+read those controls look the same for every visitor. ``prerender`` builds
+them once with the dashboard.sections builders and writes them, gzipped, next
+to the columnar cache:
+
+    python -m dashboard.snapshots [data/student_performance.csv]
+
+When the app opens a dataset it seeds the section cache from that file
+(``seed_snapshots``), so the first paint after a server start does not build
+these charts; a changed control is a different section key and is built as
+usual. The file records the CSV's version (mtime + size) and a hash of the
+dashboard code; if either differs, it is ignored until the next prerender.
+"""
+import argparse
+import glob
+import gzip
+import hashlib
+import json
+import os
+import time
+
+import plotly
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from dashboard.columnar import cache_path
+from dashboard.loader import DATA_PATH, file_version
+from dashboard.memo import DatasetCache, section_cache
+from dashboard.sections import build_heatmap, build_mekko, build_pie, build_treemap, build_violin, open_dashboard
+
+SNAPSHOT_FORMAT = 1
+# Sections pre-rendered for the default state, with the builder of each
+SNAPSHOT_BUILDERS = {
+    "treemap": build_treemap,
+    "heatmap": build_heatmap,
+    "violin": build_violin,
+    "pie": build_pie,
+    "marimekko": build_mekko,
+}
+DEFAULT_THRESHOLD = 0.5
+
+
+def default_inputs(data):
+    """Widget values of a fresh page (must match the widget defaults in app.py)."""
+    schools = list(data.df["School_Type"].unique())
+    return {
+        "treemap": {},
+        "heatmap": {
+            "school_option": schools,
+            "selected_cols": data.filtered(schools).select_dtypes(include="number").columns.tolist(),
+            "threshold": DEFAULT_THRESHOLD,
+        },
+        "violin": {},
+        "pie": {"selected_genders": list(data.df["Gender"].unique())},
+        "marimekko": {},
+    }
+
+
+def snapshot_path(csv_path=DATA_PATH):
+    target = cache_path(csv_path)
+    return os.path.join(os.path.dirname(target), os.path.basename(target) + "-snapshots.json.gz")
+
+
+def code_version():
+    # Any change to the chart code (or the Plotly version) invalidates the figures
+    digest = hashlib.sha1(plotly.__version__.encode())
+    for path in sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "*.py"))):
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def prerender(csv_path=DATA_PATH, out=None):
+    """Build the default-state figures of csv_path and write them to the snapshot file."""
+    out = out or snapshot_path(csv_path)
+    version = file_version(csv_path)
+    data = open_dashboard(csv_path)
+    entries = []
+    for section, inputs in default_inputs(data).items():
+        output = SNAPSHOT_BUILDERS[section](data, **inputs)
+        fig, caption = output if isinstance(output, tuple) else (output, None)
+        entries.append({"section": section, "inputs": inputs, "caption": caption,
+                        "figure": json.loads(pio.to_json(fig, validate=False))})
+    if file_version(csv_path) != version:
+        raise RuntimeError(f"{csv_path} changed while its figures were rendered; run again")
+
+    snapshot = {"format": SNAPSHOT_FORMAT, "data_version": list(version), "streaming": data.streaming,
+                "code_version": code_version(), "sections": entries}
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    tmp = f"{out}.{os.getpid()}.tmp"
+    with gzip.open(tmp, "wt", compresslevel=6) as f:
+        json.dump(snapshot, f)
+    os.replace(tmp, out)
+    return out, entries
+
+
+def read_snapshots(data, path=None):
+    """[(section, inputs, output)] of the snapshot file, or [] if it is missing or stale."""
+    path = path or snapshot_path(data.path)
+    try:
+        with gzip.open(path, "rt") as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return []
+    current = [SNAPSHOT_FORMAT, list(file_version(data.path)), data.streaming, code_version()]
+    if [snapshot["format"], snapshot["data_version"], snapshot["streaming"], snapshot["code_version"]] != current:
+        return []
+    sections = []
+    for entry in snapshot["sections"]:
+        # Validated when it was built; re-validating would cost about as much as building it
+        fig = go.Figure(entry["figure"], _validate=False)
+        output = (fig, entry["caption"]) if entry["caption"] is not None else fig
+        sections.append((entry["section"], entry["inputs"], output))
+    return sections
+
+
+# --> snapshots are read once per loaded dataset and snapshot file
+_seeded = DatasetCache(max_entries=2)
+
+
+def seed_snapshots(data, path=None):
+    """Put the pre-rendered figures of data into the section cache; returns how many."""
+    path = path or snapshot_path(data.path)
+    try:
+        written = os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+    def seed():
+        sections = read_snapshots(data, path)
+        for section, inputs, output in sections:
+            section_cache().put(data.df, section, inputs, output)
+        return len(sections)
+    # Keyed on the file's mtime as well, so a prerender run while the app is up is picked up
+    return _seeded.get(data.df, ("snapshots", written), seed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-render the default-state figures of a dataset")
+    parser.add_argument("csv_path", nargs="?", default=DATA_PATH)
+    parser.add_argument("--out", help="snapshot file (default: next to the columnar cache)")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    out, entries = prerender(args.csv_path, args.out)
+    for entry in entries:
+        print(f"{entry['section']:<10} {len(json.dumps(entry['figure'])):>9,} bytes of JSON")
+    print(f"wrote {out} ({os.path.getsize(out):,} bytes) in {time.perf_counter() - start:.1f}s")
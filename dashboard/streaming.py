@@ -0,0 +1,140 @@
+"""Out-of-core mode for CSV exports that do not fit in memory.
+
+The file is read once in chunks of ``STREAM_CHUNK_ROWS`` rows. Every chunk is
+folded into the statistics the charts need and then dropped:
+
+* the aggregation cube (group counts, sums and means for the treemap, pie,
+  Marimekko and Sankey charts),
+* the correlation sufficient statistics per School_Type (heatmap),
+* one quantile sketch per numeric column and (School_Type, Teacher_Quality)
+  cell (IQR bounds for the outlier toggle, box plot quartiles),
+* a uniform reservoir sample of ``STREAM_SAMPLE_SIZE`` rows, which the box,
+  parallel coordinates, 3D scatter and violin charts draw their points from.
+
+Peak memory is one chunk plus these bounded structures, whatever the file
+size. Files above ``STREAM_FILE_BYTES`` are streamed automatically;
+``DASHBOARD_STREAMING=1`` / ``0`` forces the mode on or off.
+"""
+import copy
+import os
+import threading
+
+import pandas as pd
+
+from dashboard.correlation import CorrelationEngine
+from dashboard.cube import CUBE_DIMENSIONS, CUBE_MEASURE, AggregationCube, cube_frame
+from dashboard.loader import (
+    NUMERIC_COLUMNS,
+    SCHEMA,
+    appended_since,
+    apply_schema,
+    complete_end,
+    file_version,
+    read_tail_chunks,
+    source_fingerprint,
+    source_marker,
+)
+from dashboard.sampling import ReservoirSampler
+from dashboard.sketch import PartitionedSketches
+
+STREAM_CHUNK_ROWS = 250_000
+STREAM_SAMPLE_SIZE = 100_000
+STREAM_FILE_BYTES = 1 << 30
+SKETCH_PARTITIONS = ["School_Type", "Teacher_Quality"]
+
+
+def streaming_enabled(path):
+    forced = os.environ.get("DASHBOARD_STREAMING")
+    if forced is not None:
+        return forced.lower() in ("1", "true", "yes")
+    return os.path.getsize(path) > STREAM_FILE_BYTES
+
+
+class StreamSummary:
+    def __init__(self, sample_size=STREAM_SAMPLE_SIZE, seed=0, partitions=SKETCH_PARTITIONS):
+        self.rows = 0
+        self.cube = None
+        self.correlation = None
+        self.sketches = PartitionedSketches(NUMERIC_COLUMNS, partitions)
+        self.sample = None
+        self._sampler = ReservoirSampler(sample_size, seed)
+
+    def update(self, chunk):
+        chunk = apply_schema(chunk.reset_index(drop=True))
+        self.rows += len(chunk)
+
+        frame = cube_frame(chunk)
+        if self.cube is None:
+            self.cube = AggregationCube(frame, CUBE_DIMENSIONS, CUBE_MEASURE)
+        else:
+            self.cube.update(frame)
+
+        if self.correlation is None:
+            self.correlation = CorrelationEngine.from_frame(chunk)
+        else:
+            self.correlation.update(chunk)
+
+        self.sketches.update(chunk)
+        self._sampler.update(chunk)
+        return self
+
+    def finish(self):
+        # Chunks carry their own category sets, so the sample's text columns are
+        # re-cast once at the end
+        self.sample = apply_schema(self._sampler.rows().copy())
+        return self
+
+    def sketch(self, column, where=None):
+        """Sketch of column over the rows whose partition values are in where."""
+        return self.sketches.sketch(column, where)
+
+
+def stream_dataset(path, chunk_rows=STREAM_CHUNK_ROWS, sample_size=STREAM_SAMPLE_SIZE, seed=0):
+    summary = StreamSummary(sample_size, seed)
+    for chunk in pd.read_csv(path, dtype=SCHEMA, chunksize=chunk_rows):
+        summary.update(chunk)
+    return summary.finish()
+
+
+def extend_summary(summary, path, offset, chunk_rows=STREAM_CHUNK_ROWS):
+    """Copy of summary with the rows appended after byte offset folded in."""
+    end = complete_end(path, offset)  # a half-written last line waits for the next refresh
+    summary = copy.deepcopy(summary)
+    for chunk in read_tail_chunks(path, offset, end, chunk_rows):
+        summary.update(chunk)
+    return summary.finish(), end
+
+
+# --> one summary per (path, file version), like the loader's frame cache. A
+# pass over a large file takes minutes, so it runs under a lock of its own
+# path: other files and cached summaries stay available meanwhile.
+_summaries = {}
+_summaries_lock = threading.Lock()
+_path_locks = {}
+
+
+def load_summary(path, chunk_rows=STREAM_CHUNK_ROWS, sample_size=STREAM_SAMPLE_SIZE):
+    key = os.path.abspath(path)
+    version = file_version(path)
+    with _summaries_lock:
+        cached = _summaries.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        path_lock = _path_locks.setdefault(key, threading.Lock())
+
+    with path_lock:
+        # Another session may have finished the same pass while we waited
+        with _summaries_lock:
+            cached = _summaries.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        if cached is not None and appended_since(path, cached[2]):
+            # Appended rows only: resume from the byte offset of the last pass
+            summary, end = extend_summary(cached[1], path, cached[2][0], chunk_rows)
+            marker = (end, source_fingerprint(path, end))
+        else:
+            summary = stream_dataset(path, chunk_rows, sample_size)
+            marker = source_marker(path, version) if file_version(path) == version else None
+        with _summaries_lock:
+            _summaries[key] = (version, summary, marker)
+        return summary
@@ -0,0 +1,203 @@
+"""Smaller figure payloads for the browser.
+
+Plotly already ships NumPy arrays as base64 typed arrays ("bdata"), but only
+when a trace attribute is a numeric array: anything mixed stays a JSON list.
+``compact_figure`` rewrites a built figure so that as much as possible is sent
+as narrow typed arrays, without changing what is drawn or shown on hover:
+
+* per-point numeric arrays are downcast losslessly (int64 -> int8/16/32,
+  float64 holding whole numbers -> int, float64 exact in float32 -> float32);
+* ``customdata`` that mixes numbers and category strings (hover_data) is split:
+  the numeric columns stay a 2-D typed array, and the strings are not repeated
+  per point. Scatter-type traces are split into one trace per combination of
+  the string values, whose hovertemplate carries the value as literal text
+  (one legend entry is kept per original trace); other traces (box) get the
+  single string column as ``hovertext``;
+* a box/violin trace whose category coordinate is the same for every point
+  sends it once as ``x0``/``y0`` instead of once per point.
+
+``DASHBOARD_COMPACT_FIGURES=0`` turns the rewrite off (figures are sent as
+Plotly builds them). ``python -m benchmarks.bench_payload`` measures the bytes
+per figure both ways and checks that every point's hover text is unchanged.
+"""
+import os
+import re
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# Traces that may be split into several traces without changing the drawing
+SPLITTABLE_TRACES = {"scatter", "scattergl", "scatter3d", "scatterpolar", "scatterpolargl",
+                     "scatterternary", "scattergeo", "scattermap", "scattermapbox", "scattercarpet"}
+CATEGORY_POSITION_TRACES = {"box", "violin"}
+# Arrays shorter than this are left alone (a few bytes either way)
+MIN_COMPACT_POINTS = 16
+# Above this many string combinations a trace is not split
+MAX_SPLIT_GROUPS = 64
+INT_DTYPES = [np.int8, np.uint8, np.int16, np.uint16, np.int32, np.uint32]
+_CUSTOMDATA_REF = re.compile(r"%\{customdata\[(\d+)\](?::[^}]*)?\}")
+
+
+def compact_enabled():
+    return os.environ.get("DASHBOARD_COMPACT_FIGURES", "1").lower() not in ("0", "false", "no")
+
+
+def downcast(values):
+    """Narrowest typed-array dtype that holds values exactly (None if not numeric)."""
+    if isinstance(values, (list, tuple)):
+        if not values or not all(isinstance(v, (int, float, np.number)) and not isinstance(v, bool) for v in values):
+            return None
+        values = np.asarray(values)
+    if not isinstance(values, np.ndarray) or values.dtype.kind not in "iuf" or values.size == 0:
+        return None
+    if values.dtype.kind == "f":
+        finite = np.isfinite(values).all()
+        if finite and np.array_equal(values, np.round(values)):
+            values = values.astype(np.int64) if np.abs(values).max() < 2**31 else values
+        else:
+            as32 = values.astype(np.float32)
+            return as32 if np.array_equal(as32, values, equal_nan=True) else values
+    if values.dtype.kind in "iu":
+        low, high = values.min(), values.max()
+        for dtype in INT_DTYPES:
+            info = np.iinfo(dtype)
+            if info.min <= low and high <= info.max:
+                return values.astype(dtype, copy=False)
+    return values
+
+
+def _is_number(value):
+    return isinstance(value, (int, float, np.number)) and not isinstance(value, (bool, np.bool_))
+
+
+def _per_point(spec, n, fn, skip=("customdata",)):
+    # Apply fn to every per-point array (length n) of a trace spec, nested dicts included
+    out = {}
+    for key, value in spec.items():
+        if key in skip:
+            out[key] = value
+        elif isinstance(value, dict):
+            out[key] = _per_point(value, n, fn, ())
+        elif isinstance(value, (np.ndarray, list, tuple)) and len(value) == n and key != "colorscale":
+            out[key] = fn(value)
+        else:
+            out[key] = value
+    return out
+
+
+def _take(values, rows):
+    if isinstance(values, np.ndarray):
+        return values[rows]
+    return [values[i] for i in rows]
+
+
+def _split_customdata(spec):
+    """Split mixed customdata into typed numbers plus deduplicated strings.
+
+    Returns a list of trace specs (one, or one per string combination).
+    """
+    customdata = spec.get("customdata")
+    template = spec.get("hovertemplate")
+    if not isinstance(customdata, np.ndarray) or customdata.ndim != 2 or customdata.dtype != object:
+        return [spec]
+    if not isinstance(template, str) or len(customdata) < MIN_COMPACT_POINTS:
+        return [spec]
+
+    n, width = customdata.shape
+    numeric = [j for j in range(width) if all(_is_number(v) for v in customdata[:, j])]
+    strings = [j for j in range(width) if j not in numeric]
+    if not strings:
+        return [dict(spec, customdata=customdata.astype(float))]
+
+    # Re-number the references to the numeric columns that stay in customdata
+    position = {j: k for k, j in enumerate(numeric)}
+    numbers = customdata[:, numeric].astype(float) if numeric else None
+
+    def rewrite(text, literal):
+        def sub(match):
+            j = int(match.group(1))
+            if j in position:
+                return match.group(0).replace(f"customdata[{j}]", f"customdata[{position[j]}]")
+            return literal(j)
+        return _CUSTOMDATA_REF.sub(sub, text)
+
+    base = {key: value for key, value in spec.items() if key != "customdata"}
+    if numbers is not None:
+        base["customdata"] = numbers
+
+    if spec.get("type") not in SPLITTABLE_TRACES:
+        # One string column can move to hovertext; otherwise leave the trace as it is
+        if len(strings) != 1 or "hovertext" in spec or "text" in spec:
+            return [spec]
+        column = strings[0]
+        base["hovertext"] = [str(v) for v in customdata[:, column]]
+        base["hovertemplate"] = rewrite(template, lambda j: "%{hovertext}")
+        return [base]
+
+    codes, uniques = pd.MultiIndex.from_arrays([customdata[:, j] for j in strings]).factorize()
+    if len(uniques) > MAX_SPLIT_GROUPS:
+        return [spec]
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+    legendgroup = spec.get("legendgroup") or spec.get("name")
+    parts = []
+    for g, values in enumerate(uniques):
+        rows = order[bounds[g]:bounds[g + 1]]
+        literal = dict(zip(strings, values if isinstance(values, tuple) else (values,)))
+        part = _per_point(base, n, lambda v: _take(v, rows), skip=())
+        part["hovertemplate"] = rewrite(template, lambda j: str(literal[j]))
+        if legendgroup:
+            part["legendgroup"] = legendgroup
+        if g > 0:
+            part["showlegend"] = False
+        parts.append(part)
+    return parts
+
+
+def _constant_position(spec):
+    # x = ["Low", "Low", ...] on a vertical box -> x0 = "Low" (px's placeholder
+    # x0 = " " is only used when x is missing, so it can be replaced)
+    axis = "y" if spec.get("orientation") == "h" else "x"
+    values = spec.get(axis)
+    if spec.get("type") not in CATEGORY_POSITION_TRACES:
+        return spec
+    if not isinstance(values, (np.ndarray, list, tuple)) or len(values) < MIN_COMPACT_POINTS:
+        return spec
+    first = values[0]
+    if not all(v == first for v in values):
+        return spec
+    spec = dict(spec)
+    del spec[axis]
+    spec[f"{axis}0"] = first.item() if isinstance(first, np.generic) else first
+    return spec
+
+
+def _downcast_arrays(spec):
+    out = {}
+    for key, value in spec.items():
+        if isinstance(value, dict):
+            out[key] = _downcast_arrays(value)
+        elif isinstance(value, list) and value and all(isinstance(v, dict) for v in value):
+            out[key] = [_downcast_arrays(v) for v in value]  # e.g. parcoords dimensions
+        elif isinstance(value, (np.ndarray, list)) and len(value) >= MIN_COMPACT_POINTS and key != "colorscale":
+            compact = downcast(value)
+            out[key] = value if compact is None else compact
+        else:
+            out[key] = value
+    return out
+
+
+def compact_trace(spec):
+    """Trace spec (to_plotly_json()) -> list of equivalent, smaller trace specs."""
+    spec = _constant_position(spec)
+    return [_downcast_arrays(part) for part in _split_customdata(spec)]
+
+
+def compact_figure(fig):
+    """A copy of fig with compact trace data (fig itself if compaction is off)."""
+    if not compact_enabled():
+        return fig
+    traces = [part for trace in fig.data for part in compact_trace(trace.to_plotly_json())]
+    # The traces come from a validated figure; re-validating them would cost as much as the build
+    return go.Figure({"data": traces, "layout": fig.layout.to_plotly_json()}, _validate=False)
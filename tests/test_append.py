@@ -0,0 +1,84 @@
+import copy
+
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+import pytest
+
+from dashboard import loader
+from dashboard.correlation import CorrelationEngine, get_correlation_engine
+from dashboard.cube import CUBE_DIMENSIONS, CUBE_MEASURE, AggregationCube, cube_frame, get_cube
+from dashboard.loader import DATA_PATH, load_dataset, read_dataset
+from dashboard.memo import appended_from
+
+HEAD_ROWS, TAIL_ROWS = 400, 100
+
+
+@pytest.fixture
+def csv(tmp_path):
+    rows = pd.read_csv(DATA_PATH, nrows=HEAD_ROWS + TAIL_ROWS)
+    path = str(tmp_path / "students.csv")
+    rows.iloc[:HEAD_ROWS].to_csv(path, index=False)
+    yield path, rows.iloc[HEAD_ROWS:].copy()
+    loader.clear_cache()
+
+
+def read_head(path):
+    return loader.apply_schema(pd.read_csv(path, nrows=HEAD_ROWS, dtype=loader.SCHEMA))
+
+
+def record_updates(monkeypatch, cls, calls):
+    # Let cls.update run, noting how many rows it folds in
+    update = cls.update
+
+    def recorded(self, df):
+        calls.append((cls.__name__, len(df)))
+        return update(self, df)
+    monkeypatch.setattr(cls, "update", recorded)
+
+
+def assert_cubes_equal(cube, expected):
+    assert cube.categories == expected.categories
+    for name in ["count", "n_measure", "sum", "sumsq"]:
+        np.testing.assert_allclose(getattr(cube, name), getattr(expected, name))
+    keep, where = ["School_Type", "Gender"], {"Motivation_Level": ["Low", "High"]}
+    np.testing.assert_array_equal(cube.table(keep, where)[0], expected.table(keep, where)[0])
+    tm.assert_frame_equal(cube.rollup(["Parental_Education_Level", "School_Type"]),
+                          expected.rollup(["Parental_Education_Level", "School_Type"]))
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+@pytest.mark.parametrize("new_category", [False, True])
+def test_append_matches_full_rebuild(csv, columnar, new_category, monkeypatch):
+    path, tail = csv
+    if new_category:
+        tail.loc[tail.index[3], "School_Type"] = "Charter"
+        tail.loc[tail.index[5], "Gender"] = "Other"
+
+    old = load_dataset(path, columnar=columnar)
+    old_cube, old_engine = get_cube(old), get_correlation_engine(old)
+    cube_before, engine_before = copy.deepcopy(old_cube), copy.deepcopy(old_engine)
+
+    # Only the appended rows are folded into the parent's cube and engine
+    folded = []
+    record_updates(monkeypatch, AggregationCube, folded)
+    record_updates(monkeypatch, CorrelationEngine, folded)
+    tail.to_csv(path, mode="a", header=False, index=False)
+    new = load_dataset(path, columnar=columnar)
+    assert appended_from(new) == (old, HEAD_ROWS)
+    new_cube, new_engine = get_cube(new), get_correlation_engine(new)
+    assert sorted(folded) == [("AggregationCube", TAIL_ROWS), ("CorrelationEngine", TAIL_ROWS)]
+
+    full = read_dataset(path)
+    tm.assert_frame_equal(new.copy(), full)
+    assert_cubes_equal(new_cube, AggregationCube(cube_frame(full), CUBE_DIMENSIONS, CUBE_MEASURE))
+    fresh = CorrelationEngine.from_frame(full)
+    tm.assert_frame_equal(new_engine.corr(), fresh.corr())
+    schools = list(full["School_Type"].cat.categories)
+    tm.assert_frame_equal(new_engine.corr(partitions=schools[:1]), fresh.corr(partitions=schools[:1]))
+
+    # Sessions still on the old frame keep the old aggregates
+    assert len(old) == HEAD_ROWS
+    assert_cubes_equal(old_cube, cube_before)
+    tm.assert_frame_equal(old_engine.corr(), engine_before.corr())
+    tm.assert_frame_equal(old_engine.corr(), CorrelationEngine.from_frame(read_head(path)).corr())
@@ -0,0 +1,68 @@
+import os
+
+import pandas as pd
+import pandas.testing as tm
+
+from dashboard import columnar
+from dashboard.columnar import build_columnar_cache, cache_path, read_columnar, refresh_columnar_cache
+from dashboard.loader import DATA_PATH, read_dataset
+
+
+def assert_same(df, expected):
+    # Memory-mapped columns compare as plain arrays
+    tm.assert_frame_equal(df.copy(), expected.copy())
+
+
+def write_split(tmp_path, head_rows=200, tail_rows=50, new_school=None):
+    rows = pd.read_csv(DATA_PATH, nrows=head_rows + tail_rows)
+    if new_school is not None:
+        rows.loc[head_rows + 1, "School_Type"] = new_school
+    path = str(tmp_path / "students.csv")
+    rows.iloc[:head_rows].to_csv(path, index=False)
+    return path, rows.iloc[head_rows:]
+
+
+def append(path, rows):
+    rows.to_csv(path, mode="a", header=False, index=False)
+
+
+def test_append_with_new_category_publishes_recoded_column_with_meta(tmp_path, monkeypatch):
+    path, tail = write_split(tmp_path, new_school="Charter")
+    target = build_columnar_cache(path)
+    before = read_columnar(target).copy()
+    files = {entry["name"]: entry["file"] for entry in columnar._read_meta(target)["columns"]}
+
+    # Until meta.json is swapped, readers still get the old rows with the old categories
+    write_meta = columnar._write_meta
+
+    seen = []
+
+    def read_then_write(target, meta):
+        # (refresh_columnar_cache would turn a failed read here into a rebuild)
+        try:
+            seen.append(read_columnar(target).copy())
+        except ValueError as exc:
+            seen.append(exc)
+        write_meta(target, meta)
+    monkeypatch.setattr(columnar, "_write_meta", read_then_write)
+    append(path, tail)
+    refresh_columnar_cache(path)
+    assert len(seen) == 1 and isinstance(seen[0], pd.DataFrame)
+    assert_same(seen[0], before)
+
+    assert_same(read_columnar(cache_path(path)), read_dataset(path))
+    meta = {entry["name"]: entry["file"] for entry in columnar._read_meta(target)["columns"]}
+    assert meta["School_Type"] != files["School_Type"]
+    assert not os.path.exists(os.path.join(target, files["School_Type"]))
+    assert meta["Gender"] == files["Gender"]
+
+
+def test_append_without_new_category_extends_in_place(tmp_path):
+    path, tail = write_split(tmp_path)
+    target = build_columnar_cache(path)
+    files = [entry["file"] for entry in columnar._read_meta(target)["columns"]]
+    append(path, tail)
+    refresh_columnar_cache(path)
+
+    assert_same(read_columnar(target), read_dataset(path))
+    assert [entry["file"] for entry in columnar._read_meta(target)["columns"]] == files
@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+
+from dashboard.filters import RangeIndex
+from dashboard.sections import build_parallel, open_dashboard
+
+
+def test_range_index_nan_bounds_select_nothing():
+    # min/max of an empty frame are NaN
+    index = RangeIndex(pd.DataFrame({"Hours_Studied": np.array([], dtype=np.int8)}), ["Hours_Studied"])
+    low, high = index.min("Hours_Studied"), index.max("Hours_Studied")
+    assert np.isnan(low) and np.isnan(high)
+    assert len(index.rows({"Hours_Studied": (low, high)})) == 0
+
+
+def test_parallel_with_empty_school_selection():
+    # Clearing the "Select School Type" multiselect draws an empty chart
+    data = open_dashboard()
+    index = data.parallel_index([], False)
+
+    def full(column):
+        return index.min(column), index.max(column)
+    fig, _ = build_parallel(data, [], False, full("Hours_Studied"), full("Attendance"), full("Sleep_Hours"),
+                            full(data.motivation_col))
+    assert all(len(dimension["values"]) == 0 for dimension in fig.data[0].dimensions)
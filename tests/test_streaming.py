@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+
+from dashboard.loader import DATA_PATH, source_marker
+from dashboard.streaming import extend_summary, stream_dataset
+
+
+def test_extend_summary_reads_the_appended_rows_in_chunks(tmp_path):
+    rows = pd.read_csv(DATA_PATH, nrows=700)
+    path = str(tmp_path / "students.csv")
+    rows.iloc[:500].to_csv(path, index=False)
+    summary = stream_dataset(path, chunk_rows=128)
+    offset = source_marker(path, (0, (tmp_path / "students.csv").stat().st_size))[0]
+
+    rows.iloc[500:].to_csv(path, mode="a", header=False, index=False)
+    with open(path, "a") as f:
+        f.write("19,64,Low")  # half-written row: left for the next refresh
+    extended, end = extend_summary(summary, path, offset, chunk_rows=64)
+
+    full_path = str(tmp_path / "full.csv")
+    rows.to_csv(full_path, index=False)
+    full = stream_dataset(full_path, chunk_rows=128)
+    assert end == (tmp_path / "full.csv").stat().st_size
+    assert extended.rows == full.rows == 700
+    assert summary.rows == 500
+    np.testing.assert_array_equal(extended.cube.count, full.cube.count)
+    np.testing.assert_allclose(extended.cube.sum, full.cube.sum)
+    pd.testing.assert_frame_equal(extended.correlation.corr(), full.correlation.corr())
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from dashboard.violin import GRID_POINTS, binned_kde
+
+
+@pytest.mark.parametrize("values", [
+    np.array([70.0]),
+    np.array([65.0, 71.0]),
+    np.array([70.0, 70.0, 70.0]),
+    np.random.default_rng(0).normal(67, 4, 500).round(),
+])
+def test_binned_kde_density_matches_grid(values):
+    grid, density = binned_kde(values)
+    assert len(grid) == len(density) == GRID_POINTS
+    # The grid ends two bandwidths past the data, so at most ~5% of the mass is cut off
+    assert 0.95 <= np.trapezoid(density, grid) <= 1.0 + 1e-6
+    step = grid[1] - grid[0]
+    assert values.min() - step <= grid[np.argmax(density)] <= values.max() + step
+
+
+def test_binned_kde_matches_direct_kde():
+    values = np.random.default_rng(1).normal(67, 4, 200)
+    grid, density = binned_kde(values)
+    bandwidth = (grid[-1] - grid[0] - (values.max() - values.min())) / 4
+    direct = np.exp(-0.5 * ((grid[:, None] - values[None, :]) / bandwidth) ** 2).sum(axis=1)
+    direct /= len(values) * bandwidth * np.sqrt(2 * np.pi)
+    assert np.abs(density - direct).max() < 0.01 * direct.max()